@@ -0,0 +1,158 @@
+from __future__ import annotations
+import csv
+import os
+from dataclasses import dataclass
+from math import asin, cos, radians, sin
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from ..utils.geo import EARTH_MI
+
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH")
+
+CITY_MAX_MI = 60.0     # más lejos que esto no se dice "near <ciudad>"
+EXIT_MAX_MI = 3.0      # la salida tiene que estar prácticamente sobre la ruta
+
+@dataclass(frozen=True)
+class Place:
+    kind: str            # city | exit
+    name: str            # ciudad, o nombre opcional de la salida
+    state: str = ""
+    route: str = ""      # I-70 (solo exits)
+    exit: str = ""       # 160  (solo exits)
+    lng: float = 0.0
+    lat: float = 0.0
+
+def _xyz(lng: float, lat: float) -> Tuple[float, float, float]:
+    """Punto en la esfera unitaria: la distancia euclídea (cuerda) crece con la distancia real."""
+    la, lo = radians(lat), radians(lng)
+    return (cos(la) * cos(lo), cos(la) * sin(lo), sin(la))
+
+def _chord_to_mi(d2: float) -> float:
+    return 2 * EARTH_MI * asin(min(1.0, d2 ** 0.5 / 2))
+
+class KDTree:
+    """k-d tree 3D estático (nodos en listas paralelas) para vecino más cercano."""
+
+    def __init__(self, points: Sequence[Tuple[float, float, float]]):
+        self.pts = list(points)
+        self.idx: List[int] = []
+        self.axis: List[int] = []
+        self.left: List[int] = []
+        self.right: List[int] = []
+        self.root = self._build(list(range(len(self.pts))), 0)
+
+    def __len__(self) -> int:
+        return len(self.pts)
+
+    def _build(self, items: List[int], depth: int) -> int:
+        if not items:
+            return -1
+        ax = depth % 3
+        items.sort(key=lambda i: self.pts[i][ax])
+        mid = len(items) // 2
+        node = len(self.idx)
+        self.idx.append(items[mid]); self.axis.append(ax)
+        self.left.append(-1); self.right.append(-1)
+        self.left[node] = self._build(items[:mid], depth + 1)
+        self.right[node] = self._build(items[mid + 1:], depth + 1)
+        return node
+
+    def nearest(self, q: Tuple[float, float, float]) -> Tuple[int, float]:
+        """(índice del punto, distancia² de cuerda); (-1, inf) si el árbol está vacío."""
+        pts, idx, axis, left, right = self.pts, self.idx, self.axis, self.left, self.right
+        best_i, best_d2 = -1, float("inf")
+        stack = [(self.root, 0.0)]
+        while stack:
+            node, plane_d2 = stack.pop()
+            if node < 0 or plane_d2 >= best_d2:
+                continue
+            p = pts[idx[node]]
+            dx, dy, dz = q[0] - p[0], q[1] - p[1], q[2] - p[2]
+            d2 = dx * dx + dy * dy + dz * dz
+            if d2 < best_d2:
+                best_i, best_d2 = idx[node], d2
+            diff = q[axis[node]] - p[axis[node]]
+            near, far = (left[node], right[node]) if diff < 0 else (right[node], left[node])
+            stack.append((far, diff * diff))
+            stack.append((near, 0.0))
+        return best_i, best_d2
+
+class Gazetteer:
+    """Ciudades y salidas de autopista en dos k-d trees separados."""
+
+    def __init__(self, places: Iterable[Place] = ()):
+        places = list(places)
+        self.cities = [p for p in places if p.kind == "city"]
+        self.exits = [p for p in places if p.kind == "exit"]
+        self._city_tree = KDTree([_xyz(p.lng, p.lat) for p in self.cities])
+        self._exit_tree = KDTree([_xyz(p.lng, p.lat) for p in self.exits])
+
+    def __len__(self) -> int:
+        return len(self.cities) + len(self.exits)
+
+    def _nearest(self, tree: KDTree, places: List[Place], q, max_mi: float) -> Optional[Place]:
+        i, d2 = tree.nearest(q)
+        if i < 0 or _chord_to_mi(d2) > max_mi:
+            return None
+        return places[i]
+
+    def label(self, ll) -> Optional[str]:
+        return self.label_many([ll])[0]
+
+    def label_many(self, lls) -> List[Optional[str]]:
+        """Etiqueta todas las coordenadas [lng, lat] en una sola pasada."""
+        out = []
+        for ll in lls:
+            if not ll:
+                out.append(None)
+                continue
+            q = _xyz(float(ll[0]), float(ll[1]))
+            city = self._nearest(self._city_tree, self.cities, q, CITY_MAX_MI)
+            ex = self._nearest(self._exit_tree, self.exits, q, EXIT_MAX_MI)
+            out.append(format_label(city, ex))
+        return out
+
+def format_label(city: Optional[Place], ex: Optional[Place]) -> Optional[str]:
+    """'near Effingham, IL (I-70 exit 160)'"""
+    parts = []
+    if city:
+        parts.append(f"near {city.name}, {city.state}" if city.state else f"near {city.name}")
+    if ex:
+        e = f"{ex.route} exit {ex.exit}".strip()
+        parts.append(f"({e})" if city else e)
+    return " ".join(parts) or None
+
+def label_stops(stops: List[dict], gazetteer: Optional[Gazetteer]) -> List[dict]:
+    """Agrega 'place' a cada parada que tenga una ciudad/salida cercana."""
+    if gazetteer is None or not len(gazetteer):
+        return stops
+    for stop, label in zip(stops, gazetteer.label_many([s.get("coord") for s in stops])):
+        if label:
+            stop["place"] = label
+    return stops
+
+def load_places(path: str) -> List[Place]:
+    """CSV con columnas: kind, name, state, route, exit, lng, lat."""
+    out = []
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            try:
+                out.append(Place(
+                    kind=row["kind"].strip(), name=(row.get("name") or "").strip(),
+                    state=(row.get("state") or "").strip(), route=(row.get("route") or "").strip(),
+                    exit=(row.get("exit") or "").strip(),
+                    lng=float(row["lng"]), lat=float(row["lat"]),
+                ))
+            except (KeyError, ValueError, AttributeError):
+                continue
+    return out
+
+_GAZETTEER: Optional[Gazetteer] = None
+
+def get_gazetteer() -> Gazetteer:
+    """Gazetteer compartido, cargado una sola vez por proceso (vacío si no hay GAZETTEER_PATH)."""
+    global _GAZETTEER
+    if _GAZETTEER is None:
+        places = load_places(GAZETTEER_PATH) if GAZETTEER_PATH and os.path.exists(GAZETTEER_PATH) else []
+        _GAZETTEER = Gazetteer(places)
+    return _GAZETTEER
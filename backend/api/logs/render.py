@@ -0,0 +1,287 @@
+from __future__ import annotations
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+from math import cos, sin, radians
+from typing import Any, Dict, List, Tuple
+
+# Hoja diaria estilo FMCSA: 4 filas (status) x 24 h.
+# El grid estático se genera una sola vez (lru_cache) y en PDF se reutiliza
+# como Form XObject; por día solo se dibuja la polyline, totales y remarks.
+
+WIDTH, HEIGHT = 1000, 330
+GRID_X, GRID_Y = 120, 60
+HOUR_W = 30
+ROW_H = 30
+GRID_W = 24 * HOUR_W
+ROWS = ["OffDuty", "Sleeper", "Driving", "OnDuty"]
+ROW_LABELS = ["1. Off Duty", "2. Sleeper Berth", "3. Driving", "4. On Duty"]
+GRID_H = len(ROWS) * ROW_H
+TOTALS_X = GRID_X + GRID_W + 12
+REMARKS_Y = GRID_Y + GRID_H + 14
+
+PAGE_W, PAGE_H = 792, 612            # carta horizontal (pt)
+PDF_SCALE = PAGE_W / WIDTH
+
+CACHE_MAX_BYTES = 32 << 20     # tope del caché de render (cuerpos por día y PNG completos)
+
+class RenderError(RuntimeError):
+    pass
+
+# ---- primitivas comunes (x, y en px de la hoja, y hacia abajo) ----
+# ("line", x1, y1, x2, y2, width)
+# ("poly", [(x, y), ...], width)
+# ("text", x, y, size, texto, anchor, angulo)
+
+def _hour_label(h: int) -> str:
+    if h in (0, 24):
+        return "Mid"
+    if h == 12:
+        return "Noon"
+    return str(h % 12)
+
+@lru_cache(maxsize=None)
+def _grid_ops() -> Tuple[tuple, ...]:
+    ops: List[tuple] = []
+    x0, y0, x1, y1 = GRID_X, GRID_Y, GRID_X + GRID_W, GRID_Y + GRID_H
+    for r in range(len(ROWS) + 1):
+        y = y0 + r * ROW_H
+        ops.append(("line", x0, y, x1, y, 1.0))
+    for h in range(25):
+        x = x0 + h * HOUR_W
+        ops.append(("line", x, y0, x, y1, 1.0 if h % 24 == 0 else 0.5))
+        ops.append(("text", x, y0 - 6, 8, _hour_label(h), "middle", 0))
+        if h == 24:
+            break
+        for q in (1, 2, 3):
+            xq = x + q * HOUR_W / 4
+            tick = ROW_H / 2 if q == 2 else ROW_H / 4
+            for r in range(len(ROWS)):
+                ops.append(("line", xq, y0 + r * ROW_H, xq, y0 + r * ROW_H + tick, 0.3))
+    for r, label in enumerate(ROW_LABELS):
+        ops.append(("text", x0 - 8, y0 + r * ROW_H + ROW_H / 2 + 3, 9, label, "end", 0))
+    ops.append(("text", TOTALS_X, y0 - 6, 8, "Total hrs", "start", 0))
+    ops.append(("text", x0 - 8, REMARKS_Y + 4, 9, "Remarks", "end", 0))
+    ops.append(("line", x0, REMARKS_Y - 4, x1, REMARKS_Y - 4, 0.5))
+    return tuple(ops)
+
+def _seconds_of_day(iso: str, day_start: datetime) -> float:
+    t = datetime.fromisoformat(iso.replace("Z", "+00:00")).astimezone(timezone.utc)
+    s = (t - day_start).total_seconds()
+    if s >= 86399:       # _group_by_day corta los días a 23:59:59
+        s = 86400
+    return max(0.0, min(86400.0, s))
+
+def _day_ops(day: str, log: Dict[str, Any]) -> List[tuple]:
+    day_start = datetime.fromisoformat(day).replace(tzinfo=timezone.utc)
+    segs = (log or {}).get("segments") or []
+    ops: List[tuple] = [("text", GRID_X, 24, 14, f"Driver's Daily Log - {day}", "start", 0)]
+
+    pts: List[Tuple[float, float]] = []
+    row_hours = [0.0] * len(ROWS)
+    remarks = []
+    for s in segs:
+        row = ROWS.index(s["status"]) if s.get("status") in ROWS else 0
+        a = _seconds_of_day(s["start"], day_start)
+        b = _seconds_of_day(s["end"], day_start)
+        row_hours[row] += (b - a) / 3600.0
+        y = GRID_Y + row * ROW_H + ROW_H / 2
+        xa = GRID_X + a / 3600.0 * HOUR_W
+        xb = GRID_X + b / 3600.0 * HOUR_W
+        pts.append((xa, y)); pts.append((xb, y))
+        if s.get("remark"):
+            remarks.append((xa, s["remark"]))
+    if pts:
+        ops.append(("poly", pts, 2.0))
+
+    for r, h in enumerate(row_hours):
+        ops.append(("text", TOTALS_X, GRID_Y + r * ROW_H + ROW_H / 2 + 3, 9, f"{h:.2f}", "start", 0))
+    ops.append(("text", TOTALS_X, GRID_Y + GRID_H + 12, 9, f"= {sum(row_hours):.2f}", "start", 0))
+
+    for x, text in remarks:
+        ops.append(("line", x, REMARKS_Y - 4, x, REMARKS_Y + 4, 0.8))
+        ops.append(("text", x + 2, REMARKS_Y + 10, 8, text, "start", 40))
+    return ops
+
+# ---- SVG ----
+
+def _esc_xml(s: str) -> str:
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+def _svg(ops) -> str:
+    out = []
+    for op in ops:
+        kind = op[0]
+        if kind == "line":
+            _, x1, y1, x2, y2, w = op
+            out.append(f'<line x1="{x1:g}" y1="{y1:g}" x2="{x2:g}" y2="{y2:g}" stroke-width="{w:g}"/>')
+        elif kind == "poly":
+            _, pts, w = op
+            p = " ".join(f"{x:.2f},{y:g}" for x, y in pts)
+            out.append(f'<polyline points="{p}" fill="none" stroke="#1d4ed8" stroke-width="{w:g}"/>')
+        else:
+            _, x, y, size, text, anchor, angle = op
+            rot = f' transform="rotate({angle:g} {x:g} {y:g})"' if angle else ""
+            out.append(f'<text x="{x:g}" y="{y:g}" font-size="{size:g}" text-anchor="{anchor}"{rot}>{_esc_xml(text)}</text>')
+    return "".join(out)
+
+@lru_cache(maxsize=None)
+def _grid_svg() -> str:
+    return f'<g stroke="#000" fill="none">{_svg(op for op in _grid_ops() if op[0] != "text")}</g>' \
+           f'<g fill="#000" font-family="Helvetica, Arial, sans-serif">{_svg(op for op in _grid_ops() if op[0] == "text")}</g>'
+
+def _svg_day(day: str, log: Dict[str, Any]) -> str:
+    ops = _day_ops(day, log)
+    lines = _svg(op for op in ops if op[0] != "text")
+    texts = _svg(op for op in ops if op[0] == "text")
+    return f'<g stroke="#000">{lines}</g><g fill="#000" font-family="Helvetica, Arial, sans-serif">{texts}</g>'
+
+def _svg_document(bodies: List[str]) -> bytes:
+    h = HEIGHT * len(bodies)
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" width="{WIDTH}" height="{h}" viewBox="0 0 {WIDTH} {h}">',
+             f'<defs><g id="grid">{_grid_svg()}</g></defs>']
+    for i, body in enumerate(bodies):
+        parts.append(f'<g transform="translate(0 {i * HEIGHT})"><rect width="{WIDTH}" height="{HEIGHT}" fill="#fff"/>'
+                     f'<use xlink:href="#grid"/>{body}</g>')
+    parts.append("</svg>")
+    return "".join(parts).encode("utf-8")
+
+# ---- PDF (sin dependencias: Helvetica base14 y operadores de trazo) ----
+
+def _esc_pdf(s: str) -> str:
+    s = s.encode("latin-1", "replace").decode("latin-1")
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _pdf(ops) -> bytes:
+    k = PDF_SCALE
+    out = []
+    for op in ops:
+        kind = op[0]
+        if kind == "line":
+            _, x1, y1, x2, y2, w = op
+            out.append(f"{w * k:.2f} w {x1 * k:.2f} {PAGE_H - y1 * k:.2f} m {x2 * k:.2f} {PAGE_H - y2 * k:.2f} l S")
+        elif kind == "poly":
+            _, pts, w = op
+            path = " ".join(f"{x * k:.2f} {PAGE_H - y * k:.2f} {'m' if i == 0 else 'l'}" for i, (x, y) in enumerate(pts))
+            out.append(f"q 0.11 0.31 0.85 RG {w * k:.2f} w {path} S Q")
+        else:
+            _, x, y, size, text, anchor, angle = op
+            width = 0.5 * size * len(text)     # ancho aprox. de Helvetica
+            if anchor == "middle":
+                x -= width / 2
+            elif anchor == "end":
+                x -= width
+            a = radians(-angle)
+            out.append(f"BT /F1 {size * k:.2f} Tf {cos(a):.4f} {sin(a):.4f} {-sin(a):.4f} {cos(a):.4f} "
+                       f"{x * k:.2f} {PAGE_H - y * k:.2f} Tm ({_esc_pdf(text)}) Tj ET")
+    return "\n".join(out).encode("latin-1")
+
+@lru_cache(maxsize=None)
+def _grid_pdf() -> bytes:
+    return _pdf(_grid_ops())
+
+def _pdf_day(day: str, log: Dict[str, Any]) -> bytes:
+    return _pdf(_day_ops(day, log))
+
+def _pdf_document(bodies: List[bytes]) -> bytes:
+    objs: List[bytes] = []
+
+    def add(b: bytes) -> int:
+        objs.append(b)
+        return len(objs)
+
+    def stream(extra: str, data: bytes) -> bytes:
+        return f"<< {extra} /Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream"
+
+    add(b"")                      # 1: catalog (se completa abajo)
+    add(b"")                      # 2: pages
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    grid = add(stream(f"/Type /XObject /Subtype /Form /BBox [0 0 {PAGE_W} {PAGE_H}] "
+                      f"/Resources << /Font << /F1 {font} 0 R >> >>", _grid_pdf()))
+    kids = []
+    for body in bodies:
+        content = add(stream("", b"q /Grid Do Q\n" + body))
+        kids.append(add(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_W} {PAGE_H}] "
+                        f"/Resources << /Font << /F1 {font} 0 R >> /XObject << /Grid {grid} 0 R >> >> "
+                        f"/Contents {content} 0 R >>".encode()))
+    objs[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objs[1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, b in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + b + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+# ---- caché por contenido y API pública ----
+
+FORMATS = {"svg": "image/svg+xml", "pdf": "application/pdf", "png": "image/png"}
+
+_CACHE: "OrderedDict[str, Any]" = OrderedDict()
+_CACHE_BYTES = 0
+_CACHE_LOCK = threading.Lock()     # workers con threads comparten el caché
+
+def content_key(fmt: str, day: str, log: Dict[str, Any]) -> str:
+    raw = json.dumps([fmt, day, log], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _cached(key: str, build):
+    """LRU acotado por tamaño total (len de cada valor); el build corre fuera del lock."""
+    global _CACHE_BYTES
+    with _CACHE_LOCK:
+        hit = _CACHE.get(key)
+        if hit is not None:
+            _CACHE.move_to_end(key)
+            return hit
+    val = build()
+    size = len(val)
+    if size > CACHE_MAX_BYTES:
+        return val
+    with _CACHE_LOCK:
+        if key not in _CACHE:
+            _CACHE[key] = val
+            _CACHE_BYTES += size
+        while _CACHE_BYTES > CACHE_MAX_BYTES:
+            _, old = _CACHE.popitem(last=False)
+            _CACHE_BYTES -= len(old)
+    return val
+
+def clear_cache() -> None:
+    global _CACHE_BYTES
+    with _CACHE_LOCK:
+        _CACHE.clear()
+        _CACHE_BYTES = 0
+
+def _day_body(fmt: str, day: str, log: Dict[str, Any]):
+    base = "pdf" if fmt == "pdf" else "svg"
+    build = (lambda: _pdf_day(day, log)) if base == "pdf" else (lambda: _svg_day(day, log))
+    return _cached(content_key(base, day, log), build)
+
+def render_logs(logs_by_day: Dict[str, Any], fmt: str = "svg") -> bytes:
+    """
+    Renderiza uno o varios días (logsByDay) en un solo documento:
+    SVG con las hojas apiladas, PDF con una página por día, o PNG (requiere cairosvg).
+    """
+    if fmt not in FORMATS:
+        raise RenderError(f"Formato no soportado: {fmt}")
+    days = sorted(logs_by_day.items())
+    if fmt == "pdf":
+        return _pdf_document([_day_body("pdf", d, log) for d, log in days])
+    svg = _svg_document([_day_body("svg", d, log) for d, log in days])
+    if fmt == "svg":
+        return svg
+    try:
+        import cairosvg
+    except ImportError:
+        raise RenderError("PNG requiere el paquete cairosvg")
+    key = content_key("png", "", dict(days))
+    return _cached(key, lambda: cairosvg.svg2png(bytestring=svg))
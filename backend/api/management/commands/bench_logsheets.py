@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from api.hos_engine.scheduler import plan_hos
+from api.logs import render
+
+
+class Command(BaseCommand):
+    help = "Mide el tiempo de render por hoja de log (svg/pdf), en frío y con caché."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sheets", type=int, default=1000)
+        parser.add_argument("--formats", default="svg,pdf")
+
+    def handle(self, *args, **opts):
+        # ~2000 mi de manejo => varios días de logs por viaje
+        hos = plan_hos(datetime(2025, 1, 1, 6, tzinfo=timezone.utc), 3.2e6, 40 * 3600, [])
+        base = list(hos["logsByDay"].items())
+        n = opts["sheets"]
+
+        for fmt in opts["formats"].split(","):
+            render.clear_cache()
+            # variar el remark para que cada hoja tenga un hash distinto
+            days = []
+            for i in range(n):
+                day, log = base[i % len(base)]
+                log = {**log, "segments": [{**s, "remark": f"{s.get('remark') or ''} #{i}"} for s in log["segments"]]}
+                days.append((day, log))
+
+            t0 = perf_counter()
+            for day, log in days:
+                render.render_logs({day: log}, fmt)
+            cold = perf_counter() - t0
+
+            t0 = perf_counter()
+            for day, log in days:
+                render.render_logs({day: log}, fmt)
+            warm = perf_counter() - t0
+
+            self.stdout.write(f"{fmt}: {n} hojas  frío {cold / n * 1000:.3f} ms/hoja  "
+                              f"caché {warm / n * 1000:.3f} ms/hoja")
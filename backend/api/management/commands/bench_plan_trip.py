@@ -0,0 +1,72 @@
+import json
+import resource
+import tracemalloc
+from time import perf_counter
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+
+from api.routing import ors
+from api.routing.geojson_stream import parse_directions
+
+
+def _ors_body(n: int) -> bytes:
+    # ruta recta de ~n * 2.1 m hacia el este, con un leve zig-zag
+    coords = [[-120.0 + i * 2.5e-5, 40.0 + (i % 13) * 1e-5] for i in range(n)]
+    dist, dur = n * 2.1, n * 2.1 / 25.0
+    return json.dumps({
+        "type": "FeatureCollection",
+        "features": [{
+            "type": "Feature",
+            "properties": {
+                "segments": [{"distance": dist, "duration": dur, "steps": []}],
+                "way_points": [0, n - 1],
+                "summary": {"distance": dist, "duration": dur},
+            },
+            "geometry": {"type": "LineString", "coordinates": coords},
+        }],
+    }).encode()
+
+
+class Command(BaseCommand):
+    help = ("Mide un plan-trip de punta a punta con ORS simulado: tiempo, pico de "
+            "memoria (tracemalloc) y crecimiento del RSS máximo del proceso.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vertices", type=int, default=300_000)
+        parser.add_argument("--requests", type=int, default=3)
+        parser.add_argument("--trace", action="store_true", help="medir el pico con tracemalloc (más lento)")
+
+    def handle(self, *args, **opts):
+        raw = _ors_body(opts["vertices"])
+
+        def directions(points):
+            d = parse_directions(raw[i:i + ors.CHUNK_BYTES] for i in range(0, len(raw), ors.CHUNK_BYTES))
+            d["spans"] = ors.duration_spans(d.pop("properties"))
+            return d
+
+        def geocode(q):
+            return (40.0, -120.0) if q != "dropoff" else (40.0, -120.0 + opts["vertices"] * 2.5e-5)
+
+        client = Client()
+        payload = {"current": "current", "pickup": "pickup", "dropoff": "dropoff"}
+        rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        with mock.patch.object(ors, "directions", directions), mock.patch.object(ors, "geocode", geocode):
+            for i in range(opts["requests"]):
+                if opts["trace"]:
+                    tracemalloc.start()
+                t0 = perf_counter()
+                with transaction.atomic():
+                    r = client.post("/api/plan-trip", payload, content_type="application/json",
+                                    HTTP_HOST="localhost")
+                    transaction.set_rollback(True)
+                dt = perf_counter() - t0
+                peak = ""
+                if opts["trace"]:
+                    peak = f"  pico {tracemalloc.get_traced_memory()[1] / 1e6:.0f} MB"
+                    tracemalloc.stop()
+                rss = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss0) / 1024
+                self.stdout.write(f"#{i + 1}: {r.status_code}  {len(r.content) / 1e6:.1f} MB  "
+                                  f"{dt:.2f} s{peak}  RSS máx +{rss:.0f} MB")
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:39
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Plan',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('inputs', models.JSONField(default=dict)),
+                ('route', models.JSONField(default=dict)),
+                ('stops', models.JSONField(default=list)),
+                ('hos_segments', models.JSONField(default=list)),
+                ('hos_totals', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlanDayLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.CharField(max_length=10)),
+                ('log', models.JSONField(default=dict)),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_logs', to='api.plan')),
+            ],
+            options={
+                'ordering': ['day'],
+                'constraints': [models.UniqueConstraint(fields=('plan', 'day'), name='uniq_plan_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlanGeometry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.PositiveSmallIntegerField()),
+                ('coords', models.JSONField(default=list)),
+                ('miles', models.JSONField(default=list)),
+                ('plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='geometries', to='api.plan')),
+            ],
+            options={
+                'ordering': ['level'],
+                'constraints': [models.UniqueConstraint(fields=('plan', 'level'), name='uniq_plan_level')],
+            },
+        ),
+    ]
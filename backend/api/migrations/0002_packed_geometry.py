@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:18
+
+from array import array
+
+from django.db import migrations, models
+
+
+def pack_geometries(apps, schema_editor):
+    PlanGeometry = apps.get_model("api", "PlanGeometry")
+    for g in PlanGeometry.objects.iterator():
+        g.coords = array("d", (float(v) for c in g.coords_json for v in c[:2])).tobytes()
+        g.miles = array("d", map(float, g.miles_json)).tobytes()
+        g.save(update_fields=["coords", "miles"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameField(model_name='plangeometry', old_name='coords', new_name='coords_json'),
+        migrations.RenameField(model_name='plangeometry', old_name='miles', new_name='miles_json'),
+        migrations.AddField(
+            model_name='plangeometry',
+            name='coords',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.AddField(
+            model_name='plangeometry',
+            name='miles',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(pack_geometries, migrations.RunPython.noop),
+        migrations.RemoveField(model_name='plangeometry', name='coords_json'),
+        migrations.RemoveField(model_name='plangeometry', name='miles_json'),
+    ]
@@ -1,3 +1,55 @@
+import uuid
+from array import array
+
 from django.db import models
 
-# Create your models here.
+from .utils.geo import PackedLine
+
+
+class Plan(models.Model):
+    """Plan calculado por plan-trip; los detalles pesados van en tablas hijas."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    inputs = models.JSONField(default=dict)       # current, pickup, dropoff, cycleUsedHours
+    route = models.JSONField(default=dict)        # distance_miles, duration_hours (sin geometría)
+    stops = models.JSONField(default=list)
+    hos_segments = models.JSONField(default=list)
+    hos_totals = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+
+class PlanDayLog(models.Model):
+    """Un día de logsByDay, para poder paginar los logs sin cargar el plan entero."""
+    plan = models.ForeignKey(Plan, related_name="day_logs", on_delete=models.CASCADE)
+    day = models.CharField(max_length=10)         # YYYY-MM-DD
+    log = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [models.UniqueConstraint(fields=["plan", "day"], name="uniq_plan_day")]
+
+
+class PlanGeometry(models.Model):
+    """
+    Geometría simplificada por nivel de detalle (0 = completa), precalculada al guardar.
+    Se guarda empaquetada (doubles nativos, como array('d').tobytes()) y no como
+    listas JSON: el nivel 0 de una ruta larga tiene cientos de miles de vértices.
+    """
+    plan = models.ForeignKey(Plan, related_name="geometries", on_delete=models.CASCADE)
+    level = models.PositiveSmallIntegerField()
+    coords = models.BinaryField(default=bytes)    # lng0, lat0, lng1, lat1, ...
+    miles = models.BinaryField(default=bytes)     # millas acumuladas de cada vértice
+
+    def line(self) -> PackedLine:
+        return PackedLine.frombytes(self.coords)
+
+    def mile_marks(self) -> array:
+        out = array("d")
+        out.frombytes(self.miles)
+        return out
+
+    class Meta:
+        ordering = ["level"]
+        constraints = [models.UniqueConstraint(fields=["plan", "level"], name="uniq_plan_level")]
@@ -0,0 +1,87 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+
+from ..models import Plan, PlanDayLog, PlanGeometry
+from ..utils.geo import PackedLine, cumulative_miles, simplify
+
+# (tolerancia en grados, zoom mínimo del mapa) por nivel; nivel 0 = geometría completa
+LOD_LEVELS = [
+    (0.0, 12),
+    (0.0005, 9),
+    (0.005, 6),
+    (0.05, 0),
+]
+
+def level_for_zoom(zoom: float) -> int:
+    """Nivel más grueso que sigue viéndose bien al zoom pedido."""
+    for level, (_tol, min_zoom) in enumerate(LOD_LEVELS):
+        if zoom >= min_zoom:
+            return level
+    return len(LOD_LEVELS) - 1
+
+def build_lods(coords, cum=None) -> List[Dict[str, Any]]:
+    """
+    Geometría por nivel con sus millas acumuladas (medidas sobre la ruta completa).
+    Cada nivel se simplifica a partir de los vértices del nivel anterior.
+    'cum' son las millas acumuladas de coords si ya se calcularon (EtaProfile.cum_mi).
+    Devuelve por nivel un PackedLine y un array('d') de millas.
+    """
+    line = coords if isinstance(coords, PackedLine) else PackedLine.from_pairs(coords)
+    cum = cumulative_miles(line) if cum is None else cum
+    out = []
+    idx = None      # índices en 'line' del nivel actual; None = todos
+    for level, (tol, _zoom) in enumerate(LOD_LEVELS):
+        if tol > 0:
+            kept = simplify(line, tol)
+            idx = kept if idx is None else [idx[j] for j in kept]
+            line = line.take(kept)
+        miles = (cum if isinstance(cum, array) else array("d", cum)) if idx is None else array("d", (cum[i] for i in idx))
+        out.append({"level": level, "coords": line, "miles": miles})
+    return out
+
+def slice_by_miles(coords, miles, from_mi: Optional[float], to_mi: Optional[float]):
+    """Vértices entre from_mi y to_mi (incluye un vértice extra en cada borde)."""
+    i0 = 0 if from_mi is None else max(0, bisect_right(miles, from_mi) - 1)
+    i1 = len(miles) if to_mi is None else min(len(miles), bisect_left(miles, to_mi) + 1)
+    return coords[i0:i1], miles[i0:i1]
+
+def _objects(result: Dict[str, Any], inputs: Dict[str, Any], cum=None):
+    route = dict(result["route"])
+    geometry = route.pop("geometry", None) or {}
+    hos = result["hos"]
+    plan = Plan(
+        inputs=inputs,
+        route=route,
+        stops=result["stops"],
+        hos_segments=hos["segments"],
+        hos_totals=hos["totals"],
+    )
+    days = [PlanDayLog(plan=plan, day=day, log=log) for day, log in sorted(hos["logsByDay"].items())]
+    geoms = [
+        PlanGeometry(plan=plan, level=lod["level"], coords=lod["coords"].tobytes(), miles=lod["miles"].tobytes())
+        for lod in build_lods(geometry.get("coordinates") or [], cum)
+    ]
+    return plan, days, geoms
+
+def save_plans(items: List[Dict[str, Any]]) -> List[Plan]:
+    """
+    Guarda varios planes (resultado de plan-trip + inputs) con un bulk insert por
+    tabla, dentro de una sola transacción. Pensado para replanificaciones en lote.
+    Cada item puede traer "cum" (millas acumuladas de la geometría) para no recalcularlas.
+    """
+    plans, days, geoms = [], [], []
+    for item in items:
+        p, d, g = _objects(item["result"], item.get("inputs") or {}, item.get("cum"))
+        plans.append(p); days.extend(d); geoms.extend(g)
+    with transaction.atomic():
+        Plan.objects.bulk_create(plans)
+        PlanDayLog.objects.bulk_create(days)
+        PlanGeometry.objects.bulk_create(geoms)
+    return plans
+
+def save_plan(result: Dict[str, Any], inputs: Optional[Dict[str, Any]] = None, cum=None) -> Plan:
+    return save_plans([{"result": result, "inputs": inputs, "cum": cum}])[0]
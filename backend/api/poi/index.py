@@ -0,0 +1,168 @@
+from __future__ import annotations
+import csv
+from bisect import bisect_left
+import os
+from dataclasses import dataclass
+from math import cos, radians, floor
+from typing import Dict, List, Tuple, Iterable, Optional
+
+from ..utils.geo import haversine_mi
+
+POI_PATH = os.getenv("POI_DATA_PATH")
+
+CELL_DEG = 0.25            # tamaño de celda de la grilla (~17 mi de latitud)
+MI_PER_DEG_LAT = 69.0
+SAMPLE_EVERY_MI = 0.5      # largo de los bloques de tramos que se descartan juntos en la consulta
+
+# Tipos de POI aceptables para cada tipo de parada
+STOP_KINDS = {
+    "fuel": ("truck_stop", "fuel"),
+    "break": ("truck_stop", "rest_area", "fuel"),
+    "off10": ("truck_stop", "rest_area"),
+}
+
+@dataclass(frozen=True)
+class Poi:
+    name: str
+    kind: str     # truck_stop, fuel, rest_area
+    lng: float
+    lat: float
+
+@dataclass
+class CorridorHit:
+    poi: Poi
+    mile: float         # milla del punto de la ruta más cercano al POI
+    offset_mi: float    # distancia del POI a la ruta
+
+def _cell(lng: float, lat: float) -> Tuple[int, int]:
+    return (floor(lng / CELL_DEG), floor(lat / CELL_DEG))
+
+def _project(a, b, p: Poi) -> Tuple[float, float]:
+    """
+    Proyección de p sobre el tramo a-b: (fracción t en [0, 1], distancia en millas).
+    t se calcula en un plano local (equirectangular, basta a escala de corredor).
+    """
+    kx = cos(radians(p.lat))
+    ax, ay = (a[0] - p.lng) * kx, a[1] - p.lat
+    dx, dy = (b[0] - a[0]) * kx, b[1] - a[1]
+    L2 = dx * dx + dy * dy
+    t = max(0.0, min(1.0, -(ax * dx + ay * dy) / L2)) if L2 > 0 else 0.0
+    q = (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t)
+    return t, haversine_mi(q, (p.lng, p.lat))
+
+class PoiIndex:
+    """
+    Índice espacial en grilla (lng/lat) de POIs.
+    Cada celda guarda sus POIs; una consulta solo mira las celdas vecinas
+    a los vértices de la ruta que caen en la ventana de millas pedida.
+    """
+
+    def __init__(self, pois: Iterable[Poi] = ()):
+        self._cells: Dict[Tuple[int, int], List[Poi]] = {}
+        self._size = 0
+        for p in pois:
+            self.add(p)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, p: Poi) -> None:
+        self._cells.setdefault(_cell(p.lng, p.lat), []).append(p)
+        self._size += 1
+
+    def near_point(self, ll, radius_mi: float, kinds: Optional[Iterable[str]] = None) -> List[Tuple[float, Poi]]:
+        """POIs a <= radius_mi de ll=[lng, lat], ordenados por distancia."""
+        kinds = set(kinds) if kinds else None
+        out = []
+        for p in self._candidates(ll[0], ll[1], radius_mi):
+            if kinds and p.kind not in kinds:
+                continue
+            d = haversine_mi(ll, (p.lng, p.lat))
+            if d <= radius_mi:
+                out.append((d, p))
+        out.sort(key=lambda x: x[0])
+        return out
+
+    def nearest_in_corridor(self, coords, cum, mile: float, corridor_mi: float = 2.0,
+                            back_mi: float = 50.0, ahead_mi: float = 0.0,
+                            kinds: Optional[Iterable[str]] = None) -> Optional[CorridorHit]:
+        """
+        POI más cercano (en millas de ruta) a 'mile' dentro de un corredor de
+        'corridor_mi' alrededor de la ruta, buscando en [mile-back_mi, mile+ahead_mi].
+        'cum' son las millas acumuladas de 'coords' (geo.cumulative_miles).
+        La distancia se mide a los tramos de la ruta (no solo a los vértices) y
+        la milla devuelta es la del punto proyectado.
+        """
+        if not self._size or not coords:
+            return None
+        kinds = set(kinds) if kinds else None
+        lo, hi = mile - back_mi, mile + ahead_mi
+
+        best: Dict[Poi, Tuple[float, float]] = {}   # poi -> (offset, milla)
+        # 'cum' está ordenado: se salta con búsqueda binaria al inicio de la
+        # ventana (el tramo que cruza 'lo' también cuenta) y se avanza por
+        # bloques de ~SAMPLE_EVERY_MI. Todo el bloque i..j queda a menos de
+        # (cum[j] - cum[i]) de coords[i]: con eso se descartan POIs sin leer
+        # los vértices intermedios; a los que quedan se les mide la distancia
+        # a cada tramo del bloque.
+        n = len(cum)
+        i = max(0, bisect_left(cum, lo) - 1)
+        while i < n - 1 and cum[i] <= hi:
+            j = min(n - 1, max(i + 1, bisect_left(cum, cum[i] + SAMPLE_EVERY_MI, i + 1)))
+            c = coords[i]
+            reach = corridor_mi + (cum[j] - cum[i])
+            block = None
+            for p in self._candidates(c[0], c[1], reach):
+                if kinds and p.kind not in kinds:
+                    continue
+                if haversine_mi(c, (p.lng, p.lat)) > reach:
+                    continue
+                if block is None:
+                    block = [c] + [coords[k] for k in range(i + 1, j + 1)]
+                for k in range(j - i):
+                    t, d = _project(block[k], block[k + 1], p)
+                    if d > corridor_mi:
+                        continue
+                    m = cum[i + k] + (cum[i + k + 1] - cum[i + k]) * t
+                    if not lo <= m <= hi:
+                        continue
+                    prev = best.get(p)
+                    if prev is None or d < prev[0]:
+                        best[p] = (d, m)
+            i = j
+
+        if not best:
+            return None
+        p, (d, m) = min(best.items(), key=lambda kv: (abs(kv[1][1] - mile), kv[1][0]))
+        return CorridorHit(poi=p, mile=m, offset_mi=d)
+
+    def _candidates(self, lng: float, lat: float, radius_mi: float):
+        dlat = radius_mi / MI_PER_DEG_LAT
+        dlng = radius_mi / (MI_PER_DEG_LAT * max(cos(radians(lat)), 0.01))
+        x0, y0 = floor((lng - dlng) / CELL_DEG), floor((lat - dlat) / CELL_DEG)
+        x1, y1 = floor((lng + dlng) / CELL_DEG) + 1, floor((lat + dlat) / CELL_DEG) + 1
+        for x in range(x0, x1):
+            for y in range(y0, y1):
+                yield from self._cells.get((x, y), ())
+
+def load_pois(path: str) -> List[Poi]:
+    """CSV con columnas: name, kind, lng, lat."""
+    out = []
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            try:
+                out.append(Poi(row["name"].strip(), row["kind"].strip(),
+                               float(row["lng"]), float(row["lat"])))
+            except (KeyError, ValueError, AttributeError):
+                continue
+    return out
+
+_INDEX: Optional[PoiIndex] = None
+
+def get_index() -> PoiIndex:
+    """Índice compartido, cargado una sola vez por proceso (vacío si no hay POI_DATA_PATH)."""
+    global _INDEX
+    if _INDEX is None:
+        pois = load_pois(POI_PATH) if POI_PATH and os.path.exists(POI_PATH) else []
+        _INDEX = PoiIndex(pois)
+    return _INDEX
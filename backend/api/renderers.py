@@ -0,0 +1,74 @@
+import json
+import uuid
+from array import array
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .utils.geo import PackedLine
+
+VALUES_PER_CHUNK = 8192
+
+
+def packed_json_chunks(obj):
+    """
+    Texto JSON de un PackedLine ([[lng, lat], ...]) o de un array('d') ([m, ...])
+    por bloques, leyendo directo de los doubles: no crea una lista por vértice.
+    Mismo formato de número que json (repr).
+    """
+    pairs = isinstance(obj, PackedLine)
+    data = obj.data if pairs else obj
+    yield b"["
+    for k in range(0, len(data), VALUES_PER_CHUNK):
+        block = data[k:k + VALUES_PER_CHUNK]
+        if pairs:
+            it = iter(block)
+            text = ",".join("[%r,%r]" % p for p in zip(it, it))
+        else:
+            text = ",".join(map(repr, block))
+        yield (text if k == 0 else "," + text).encode("ascii")
+    yield b"]"
+
+
+class _PlaceholderEncoder(JSONEncoder):
+    """Deja un marcador por cada PackedLine / array('d'); el renderer lo reemplaza después."""
+    token = ""
+    lines = None
+
+    def default(self, obj):
+        if isinstance(obj, PackedLine) or (isinstance(obj, array) and obj.typecode == "d"):
+            self.lines.append(obj)
+            return f"{self.token}{len(self.lines) - 1}"
+        return super().default(obj)
+
+
+class PackedJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer que escribe las geometrías PackedLine (y los array('d') de
+    millas) desde los doubles en lugar de pasar por tolist(): el resto del
+    documento se serializa normal y cada arreglo se empalma en bytes donde
+    quedó su marcador.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        lines = []
+        token = f"@packed-{uuid.uuid4().hex}-"
+        encoder = type("_Encoder", (_PlaceholderEncoder,), {"token": token, "lines": lines})
+        self.encoder_class = encoder
+        try:
+            body = super().render(data, accepted_media_type, renderer_context)
+        finally:
+            del self.encoder_class
+        if not lines:
+            return body
+
+        quoted = json.dumps(token).encode("ascii")[:-1]   # '"<token>' sin la comilla final
+        out = bytearray()
+        parts = body.split(quoted)
+        out += parts[0]
+        for part in parts[1:]:
+            idx, rest = part.split(b'"', 1)
+            for chunk in packed_json_chunks(lines[int(idx)]):
+                out += chunk
+            out += rest
+        return bytes(out)
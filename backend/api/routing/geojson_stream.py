@@ -0,0 +1,158 @@
+from __future__ import annotations
+import codecs
+import json
+import re
+from itertools import chain
+from typing import Any, Dict, Iterable
+
+from ..utils.geo import PackedLine
+
+# Parser incremental de la respuesta GeoJSON de ORS /v2/directions.
+# No arma el árbol completo: las coordenadas van directo a un PackedLine
+# (array de doubles) y solo se decodifican con json los 'properties' del
+# primer feature (summary, segments). El buffer queda acotado al chunk
+# más lo pendiente de un token o de 'properties'.
+
+# Los números fuera de 'coordinates' no se usan: se aceptan de forma laxa
+# para que un número cortado entre chunks ("1" + ".5") no se parta en dos.
+_TOKEN = re.compile(r'\s*(?:([{}\[\],:])|("(?:[^"\\]|\\.)*")|(-?[\d.eE+-]+)|(true|false|null))')
+_NUM = r'-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?'
+_PAIR = re.compile(rf'\[\s*({_NUM})\s*,\s*({_NUM})\s*(?:,\s*{_NUM}\s*)?\]')
+_COORDS_END = re.compile(r'\]\s*\]')
+_CLOSE = re.compile(r'\s*\]')
+
+_COORDS_PATH = ("features", 0, "geometry", "coordinates")
+_PROPS_PATH = ("features", 0, "properties")
+
+MAX_PENDING = 1 << 20     # un token suelto nunca debería pasar de esto
+
+
+class StreamParseError(ValueError):
+    pass
+
+
+class _DirectionsParser:
+    def __init__(self):
+        self.buf = ""
+        self.pos = 0
+        self.stack = []           # [tipo, clave|índice, espera_clave]
+        self.in_coords = False
+        self.coords = PackedLine()
+        self.props_depth = None   # profundidad del stack mientras se captura 'properties'
+        self.props_parts = []
+        self.props_start = 0
+        self.properties: Dict[str, Any] = {}
+        self.done = False
+
+    def _path(self):
+        return tuple(f[1] for f in self.stack)
+
+    def feed(self, text: str, final: bool = False):
+        self.buf = self.buf[self.pos:] + text
+        if self.props_depth is not None:
+            self.props_start -= self.pos
+        self.pos = 0
+        while not self.done:
+            if self.in_coords:
+                if not self._scan_coords():
+                    break
+                continue
+            if not self._step(final):
+                break
+        if self.props_depth is not None:
+            self.props_parts.append(self.buf[self.props_start:self.pos])
+            self.props_start = self.pos
+        if len(self.buf) - self.pos > MAX_PENDING:
+            raise StreamParseError("Token demasiado largo en la respuesta de directions")
+
+    def _scan_coords(self) -> bool:
+        buf, pos = self.buf, self.pos
+        if _CLOSE.match(buf, pos):
+            self.in_coords = False
+            return True
+        m = _COORDS_END.search(buf, pos)
+        if m:
+            end = m.start() + 1
+        else:
+            end = buf.rfind("]", pos) + 1
+            if end <= pos:
+                return False
+        pairs = _PAIR.findall(buf, pos, end)
+        self.coords.data.extend(map(float, chain.from_iterable(pairs)))
+        self.pos = end
+        if m:
+            self.in_coords = False
+        return m is not None
+
+    def _step(self, final: bool) -> bool:
+        m = _TOKEN.match(self.buf, self.pos)
+        if not m:
+            if self.buf[self.pos:].strip() == "":
+                return False
+            if final:
+                raise StreamParseError("JSON inválido en la respuesta de directions")
+            return False
+        if m.end() == len(self.buf) and not final and (m.group(3) or m.group(4)):
+            return False          # número/literal posiblemente cortado
+        self.pos = m.end()
+        punct, string = m.group(1), m.group(2)
+        top = self.stack[-1] if self.stack else None
+
+        if punct in ("{", "["):
+            if top is not None and top[0] == "map" and top[2]:
+                raise StreamParseError("Se esperaba una clave")
+            kind = "map" if punct == "{" else "arr"
+            self.stack.append([kind, None if kind == "map" else 0, kind == "map"])
+            path = self._path()[:-1]
+            if kind == "map" and path == _PROPS_PATH and not self.properties and self.props_depth is None:
+                self.props_depth = len(self.stack)
+                self.props_start = m.end() - 1
+                self.props_parts = []
+            elif kind == "arr" and path == _COORDS_PATH:
+                self.in_coords = True
+        elif punct in ("}", "]"):
+            if not self.stack:
+                raise StreamParseError("Cierre inesperado")
+            if self.props_depth == len(self.stack):
+                self.props_parts.append(self.buf[self.props_start:self.pos])
+                self.properties = json.loads("".join(self.props_parts))
+                self.props_depth, self.props_parts = None, []
+            self.stack.pop()
+            if not self.stack:
+                self.done = True
+        elif punct == ",":
+            if top is None:
+                raise StreamParseError("Coma inesperada")
+            if top[0] == "arr":
+                top[1] += 1
+            else:
+                top[1], top[2] = None, True
+        elif punct == ":":
+            pass
+        elif string is not None and top is not None and top[0] == "map" and top[2]:
+            top[1], top[2] = json.loads(string), False
+        return True
+
+
+def parse_directions(chunks: Iterable[bytes]) -> Dict[str, Any]:
+    """
+    Lee el body de directions (chunks de bytes) y devuelve
+    {"geometry": {"type": "LineString", "coordinates": PackedLine}, "distance_m", "duration_s", "properties"}.
+    """
+    p = _DirectionsParser()
+    dec = codecs.getincrementaldecoder("utf-8")()
+    for chunk in chunks:
+        if chunk:
+            p.feed(dec.decode(chunk))
+    p.feed(dec.decode(b"", final=True), final=True)
+    if not p.done:
+        raise StreamParseError("Respuesta de directions incompleta")
+    if not p.properties or not len(p.coords):
+        raise StreamParseError("Respuesta de directions sin feature/geometría")
+    summary = p.properties.get("summary") or {}
+    return {
+        "geometry": {"type": "LineString", "coordinates": p.coords},
+        "distance_m": float(summary.get("distance") or 0.0),
+        "duration_s": float(summary.get("duration") or 0.0),
+        "properties": p.properties,
+    }
@@ -2,8 +2,11 @@ import os
 import requests
 from typing import Tuple, List, Dict, Any
 
+from .geojson_stream import parse_directions, StreamParseError
+
 ORS_BASE = "https://api.openrouteservice.org"
 ORS_KEY = os.getenv("ORS_API_KEY")
+CHUNK_BYTES = 64 * 1024
 
 class OrsError(RuntimeError):
     pass
@@ -39,20 +42,43 @@ def geocode(q: str) -> Tuple[float, float]:
     lng, lat = feats[0]["geometry"]["coordinates"]
     return (lat, lng)
 
+def duration_spans(props: Dict[str, Any]) -> List[Tuple[int, int, float]]:
+    """
+    Tramos (i0, i1, duración_s) sobre los índices de la geometría: los steps
+    si vienen, si no un tramo por segment entre los way_points de la ruta.
+    """
+    segments = props.get("segments") or []
+    spans = []
+    for seg in segments:
+        for st in seg.get("steps") or []:
+            wp = st.get("way_points") or []
+            if len(wp) == 2:
+                spans.append((int(wp[0]), int(wp[1]), float(st.get("duration") or 0.0)))
+    if spans:
+        return spans
+    wps = props.get("way_points") or []
+    if len(wps) == len(segments) + 1:
+        return [(int(wps[i]), int(wps[i + 1]), float(segments[i].get("duration") or 0.0))
+                for i in range(len(segments))]
+    return []
+
 def directions(coords_latlng: List[Tuple[float, float]]) -> Dict[str, Any]:
     if not ORS_KEY:
         raise OrsError("ORS_API_KEY no configurada")
     coords_lnglat = [[lnglat[1], lnglat[0]] for lnglat in coords_latlng]
     for profile in ("driving-hgv", "driving-car"):
         url = f"{ORS_BASE}/v2/directions/{profile}/geojson"
-        body = {"coordinates": coords_lnglat, "instructions": False}
-        r = requests.post(url, json=body, headers={"Authorization": ORS_KEY}, timeout=40)
-        if r.status_code == 200:
-            f = r.json()["features"][0]
-            props = f["properties"]
-            return {
-                "geometry": f["geometry"],
-                "distance_m": props["summary"]["distance"],
-                "duration_s": props["summary"]["duration"],
-            }
-    raise OrsError(f"Directions error: {r.status_code} {r.text}")
+        # instructions=True: los steps traen duración y way_points por tramo (perfil de ETA)
+        body = {"coordinates": coords_lnglat, "instructions": True}
+        # stream=True: la geometría se parsea por chunks a un PackedLine,
+        # sin cargar el GeoJSON completo como listas de listas.
+        with requests.post(url, json=body, headers={"Authorization": ORS_KEY}, timeout=40, stream=True) as r:
+            if r.status_code == 200:
+                try:
+                    d = parse_directions(r.iter_content(CHUNK_BYTES))
+                except StreamParseError as e:
+                    raise OrsError(f"Directions error: respuesta inválida ({e})")
+                d["spans"] = duration_spans(d.pop("properties"))
+                return d
+            status, text = r.status_code, r.text
+    raise OrsError(f"Directions error: {status} {text}")
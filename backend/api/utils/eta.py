@@ -0,0 +1,118 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .geo import cumulative_miles
+
+
+class EtaProfile:
+    """
+    Perfil acumulado de distancia y tiempo de manejo por vértice.
+
+    Se arma en una pasada a partir de tramos (i0, i1, duración_s) — los steps
+    de ORS — repartiendo cada duración según la distancia dentro del tramo.
+    Después: tiempo -> posición y milla -> tiempo por búsqueda binaria, o en
+    barrido lineal si las consultas vienen ordenadas.
+    """
+    __slots__ = ("coords", "cum_mi", "cum_s")
+
+    def __init__(self, coords, spans: Optional[Sequence[Tuple[int, int, float]]] = None,
+                 total_s: float = 0.0):
+        self.coords = coords
+        self.cum_mi = cumulative_miles(coords)
+        n = len(self.cum_mi)
+        self.cum_s = array("d", bytes(8 * n))
+        if n < 2:
+            return
+        if not spans:
+            spans = [(0, n - 1, float(total_s))]
+
+        cum_mi, cum_s = self.cum_mi, self.cum_s
+        last = 0
+        for i0, i1, dur in sorted(spans):
+            i0, i1 = max(int(i0), last), min(int(i1), n - 1)
+            if i1 <= i0:
+                continue
+            for k in range(last + 1, i0 + 1):     # hueco entre tramos: sin tiempo
+                cum_s[k] = cum_s[k - 1]
+            t0, m0 = cum_s[i0], cum_mi[i0]
+            length = cum_mi[i1] - m0
+            dur = max(0.0, float(dur))
+            for k in range(i0 + 1, i1 + 1):
+                frac = (cum_mi[k] - m0) / length if length > 0 else (k - i0) / (i1 - i0)
+                cum_s[k] = t0 + dur * frac
+            last = i1
+        for k in range(last + 1, n):
+            cum_s[k] = cum_s[k - 1]
+
+    def __len__(self) -> int:
+        return len(self.cum_s)
+
+    @property
+    def total_s(self) -> float:
+        return self.cum_s[-1] if len(self.cum_s) else 0.0
+
+    @property
+    def total_mi(self) -> float:
+        return self.cum_mi[-1] if len(self.cum_mi) else 0.0
+
+    def _at(self, i: int, frac: float):
+        """(milla, [lng, lat]) entre el vértice i-1 y el i."""
+        a, b = self.coords[i - 1], self.coords[i]
+        mile = self.cum_mi[i - 1] + (self.cum_mi[i] - self.cum_mi[i - 1]) * frac
+        return mile, [a[0] + (b[0] - a[0]) * frac, a[1] + (b[1] - a[1]) * frac]
+
+    def _locate(self, i: int, t: float):
+        n = len(self.cum_s)
+        if n == 0:
+            return 0.0, [0, 0]
+        if i <= 0 or t <= 0:
+            return 0.0, list(self.coords[0])
+        if i >= n:
+            return self.total_mi, list(self.coords[-1])
+        dt = self.cum_s[i] - self.cum_s[i - 1]
+        return self._at(i, (t - self.cum_s[i - 1]) / dt if dt > 0 else 1.0)
+
+    def locate(self, t_s: float):
+        """Segundos de manejo desde el inicio -> (milla, [lng, lat]). Búsqueda binaria."""
+        return self._locate(bisect_left(self.cum_s, t_s), t_s)
+
+    def time_at_mile(self, mile: float) -> float:
+        """Milla -> segundos de manejo desde el inicio. Búsqueda binaria."""
+        return self._time(bisect_left(self.cum_mi, mile), mile)
+
+    def _time(self, i: int, mile: float) -> float:
+        n = len(self.cum_mi)
+        if n == 0 or i <= 0 or mile <= 0:
+            return 0.0
+        if i >= n:
+            return self.total_s
+        dm = self.cum_mi[i] - self.cum_mi[i - 1]
+        frac = (mile - self.cum_mi[i - 1]) / dm if dm > 0 else 1.0
+        return self.cum_s[i - 1] + (self.cum_s[i] - self.cum_s[i - 1]) * frac
+
+    def locate_many(self, times: Iterable[float]) -> List[Tuple[float, list]]:
+        """Como locate() para tiempos no decrecientes, en un solo barrido lineal."""
+        out, i, n, cum_s = [], 0, len(self.cum_s), self.cum_s
+        prev = float("-inf")
+        for t in times:
+            if t < prev:
+                i = 0
+            prev = t
+            while i < n and cum_s[i] < t:
+                i += 1
+            out.append(self._locate(i, t))
+        return out
+
+    def times_at_miles(self, miles: Iterable[float]) -> List[float]:
+        """Como time_at_mile() para millas no decrecientes, en un solo barrido lineal."""
+        out, i, n, cum_mi = [], 0, len(self.cum_mi), self.cum_mi
+        prev = float("-inf")
+        for m in miles:
+            if m < prev:
+                i = 0
+            prev = m
+            while i < n and cum_mi[i] < m:
+                i += 1
+            out.append(self._time(i, m))
+        return out
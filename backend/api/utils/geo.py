@@ -1,8 +1,84 @@
 
+from array import array
+from bisect import bisect_left
+from collections import deque
 from math import radians, cos, sin, asin, sqrt
 
 EARTH_MI = 3958.7613
 
+
+class PackedLine:
+    """
+    Polyline compacta: [lng0, lat0, lng1, lat1, ...] en un array('d').
+    Se comporta como secuencia de pares (lng, lat) para los helpers de este
+    módulo, sin crear una lista por vértice. La respuesta la escribe
+    api.renderers.PackedJSONRenderer directo del array (tolist() queda para
+    otros encoders).
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data=None):
+        self.data = data if isinstance(data, array) else array("d", data or ())
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        data = array("d")
+        for p in pairs:
+            data.append(float(p[0])); data.append(float(p[1]))
+        return cls(data)
+
+    def __len__(self):
+        return len(self.data) // 2
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return PackedLine.from_pairs(self[k] for k in range(start, stop, step))
+            return PackedLine(self.data[2 * start:2 * max(start, stop)])
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("PackedLine index out of range")
+        return (self.data[2 * i], self.data[2 * i + 1])
+
+    def __iter__(self):
+        it = iter(self.data)
+        return zip(it, it)
+
+    def __bool__(self):
+        return len(self.data) > 0
+
+    def __eq__(self, other):
+        if isinstance(other, PackedLine):
+            return self.data == other.data
+        return NotImplemented
+
+    def join(self, other):
+        """Concatena sin duplicar el vértice de empalme."""
+        data = array("d", self.data[:-2] if self.data else ())
+        data.extend(other.data if isinstance(other, PackedLine) else PackedLine.from_pairs(other).data)
+        return PackedLine(data)
+
+    def take(self, indices):
+        """Sub-polyline con los vértices de 'indices' (en el orden dado)."""
+        src, data = self.data, array("d")
+        for i in indices:
+            data.append(src[2 * i]); data.append(src[2 * i + 1])
+        return PackedLine(data)
+
+    def tobytes(self):
+        return self.data.tobytes()
+
+    @classmethod
+    def frombytes(cls, raw):
+        data = array("d")
+        data.frombytes(raw)
+        return cls(data)
+
+    def tolist(self):
+        return [list(p) for p in self]
+
 def haversine_mi(a, b):
     """a, b: [lng, lat]"""
     lon1, lat1 = a; lon2, lat2 = b
@@ -30,3 +106,96 @@ def coord_along_line(coords, target_miles):
             return [lon, lat]
         acc += seg
     return coords[-1]
+
+def cumulative_miles(coords):
+    """
+    Millas acumuladas en cada vértice de 'coords' (misma longitud).
+    Se calcula una sola vez y se reutiliza para búsquedas por milla.
+    """
+    out = array("d")
+    acc = 0.0
+    prev = None
+    for c in coords:
+        if prev is not None:
+            acc += haversine_mi(prev, c)
+        out.append(acc)
+        prev = c
+    return out
+
+def coord_at_mile(coords, cum, target_miles):
+    """
+    Igual que coord_along_line pero con las millas acumuladas ya calculadas
+    (búsqueda binaria en vez de recorrer toda la polyline).
+    """
+    if not coords:
+        return [0, 0]
+    if target_miles <= 0:
+        return coords[0]
+    i = bisect_left(cum, target_miles)
+    if i >= len(coords):
+        return coords[-1]
+    seg = cum[i] - cum[i-1] if i > 0 else 0.0
+    if seg <= 0:
+        return coords[i]
+    t = (target_miles - cum[i-1]) / seg
+    lon = coords[i-1][0] + (coords[i][0] - coords[i-1][0]) * t
+    lat = coords[i-1][1] + (coords[i][1] - coords[i-1][1]) * t
+    return [lon, lat]
+
+SIMPLIFY_WORK_PER_VERTEX = 16  # presupuesto de vértices visitados: peor caso O(n); rutas reales usan ~log2(salida)
+
+def simplify(coords, tol_deg, work_per_vertex=SIMPLIFY_WORK_PER_VERTEX):
+    """
+    Douglas-Peucker (iterativo, en grados) para reducir vértices.
+    Devuelve los índices de 'coords' que se conservan, en orden.
+    Antes se descartan en O(n) los vértices a menos de tol_deg del último
+    conservado. Los tramos se parten a lo ancho (cola) con un presupuesto de
+    work_per_vertex * n vértices visitados: si se agota, los tramos que
+    quedan se dejan como están (pueden exceder la tolerancia, pero es solo
+    para dibujar) y el detalle se pierde de forma pareja en toda la ruta.
+    """
+    n = len(coords)
+    if n <= 2 or tol_deg <= 0:
+        return list(range(n))
+    tol2 = tol_deg * tol_deg
+    if isinstance(coords, PackedLine):
+        all_x, all_y = coords.data[0::2], coords.data[1::2]
+    else:
+        all_x, all_y = [c[0] for c in coords], [c[1] for c in coords]
+
+    # pre-filtro radial
+    idx = [0]
+    lx, ly = all_x[0], all_y[0]
+    for k in range(1, n - 1):
+        dx, dy = all_x[k] - lx, all_y[k] - ly
+        if dx * dx + dy * dy > tol2:
+            idx.append(k)
+            lx, ly = all_x[k], all_y[k]
+    idx.append(n - 1)
+    xs, ys = [all_x[i] for i in idx], [all_y[i] for i in idx]
+
+    m = len(idx)
+    keep = [False] * m
+    keep[0] = keep[-1] = True
+    budget = work_per_vertex * m
+    queue = deque([(0, m - 1)])
+    while queue and budget > 0:
+        i0, i1 = queue.popleft()
+        budget -= i1 - i0 - 1
+        ax, ay = xs[i0], ys[i0]
+        dx, dy = xs[i1] - ax, ys[i1] - ay
+        L2 = dx * dx + dy * dy
+        best, best_d2 = -1, tol2
+        for k in range(i0 + 1, i1):
+            px, py = xs[k] - ax, ys[k] - ay
+            if L2 > 0:
+                t = max(0.0, min(1.0, (px * dx + py * dy) / L2))
+                px, py = px - t * dx, py - t * dy
+            d2 = px * px + py * py
+            if d2 > best_d2:
+                best, best_d2 = k, d2
+        if best >= 0:
+            keep[best] = True
+            queue.append((i0, best))
+            queue.append((best, i1))
+    return [idx[j] for j in range(m) if keep[j]]
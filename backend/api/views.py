@@ -2,14 +2,23 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import DatabaseError
+from django.http import HttpResponse
 
 from datetime import datetime, timedelta, timezone
 from typing import Any, Sequence, Optional, List, Dict
 
-from .routing.ors import geocode, directions, OrsError
+from .routing import ors
+from .routing.ors import OrsError
 from .hos_engine.scheduler import plan_hos
 from .logs.generator import to_paperlog_payload
-from .utils.geo import coord_along_line
+from .logs.render import render_logs, RenderError, FORMATS
+from .utils.geo import PackedLine, coord_at_mile
+from .utils.eta import EtaProfile
+from .poi.index import get_index, STOP_KINDS
+from .geocode.reverse import get_gazetteer, label_stops
+from .models import Plan, PlanDayLog, PlanGeometry
+from .plans.store import save_plan, level_for_zoom, slice_by_miles
 
 MI_PER_M = 0.000621371
 HOUR = 3600
@@ -66,11 +75,19 @@ def _merge_routes(r1: Dict, r2: Dict) -> Dict:
     """Suma distancia/duración y concatena geometrías (sin duplicar el vértice de empalme)."""
     c1 = (r1.get("geometry") or {}).get("coordinates") or []
     c2 = (r2.get("geometry") or {}).get("coordinates") or []
-    coords = (c1[:-1] if c1 else []) + (c2 or [])
+    if isinstance(c1, PackedLine) or isinstance(c2, PackedLine):
+        coords = (c1 if isinstance(c1, PackedLine) else PackedLine.from_pairs(c1)).join(c2) if c1 else c2
+    else:
+        coords = (c1[:-1] if c1 else []) + (c2 or [])
+    # tramos de duración: los de r2 se corren al índice de empalme
+    off = len(c1) - 1 if c1 else 0
+    s1 = r1.get("spans") or ([(0, len(c1) - 1, float(r1["duration_s"]))] if c1 else [])
+    s2 = r2.get("spans") or ([(0, len(c2) - 1, float(r2["duration_s"]))] if c2 else [])
     return {
         "distance_m": float(r1["distance_m"]) + float(r2["distance_m"]),
         "duration_s": float(r1["duration_s"]) + float(r2["duration_s"]),
         "geometry": {"type": "LineString", "coordinates": coords},
+        "spans": list(s1) + [(a + off, b + off, dur) for a, b, dur in s2],
     }
 
 
@@ -83,21 +100,65 @@ def directions_with_fallback(points: List[Sequence[float]]) -> Dict:
         raise ValueError("Se requieren al menos 2 coordenadas")
 
     try:
-        return directions(points)
+        return ors.directions(points)
     except OrsError:
         if len(points) >= 3:
             total = None
             for i in range(len(points) - 1):
-                leg = directions(points[i:i + 2])
+                leg = ors.directions(points[i:i + 2])
                 total = leg if total is None else _merge_routes(total, leg)
             return total
         raise
 
 
 
-def build_stops(geometry, hos, pickup_ll, dropoff_ll, total_miles):
+def _snap_stop(stop, coords, cum, poi_index):
+    """
+    Mueve la parada al POI válido más cercano (hacia atrás en la ruta, para no
+    pasarse del límite HOS / combustible). Si no hay POI, la deja interpolada.
+    """
+    if poi_index is None or not len(poi_index):
+        return stop
+    hit = poi_index.nearest_in_corridor(coords, cum, stop["mile"], kinds=STOP_KINDS.get(stop["type"]))
+    if hit:
+        stop["mile"] = hit.mile
+        stop["coord"] = [hit.poi.lng, hit.poi.lat]
+        stop["poi"] = {"name": hit.poi.name, "kind": hit.poi.kind}
+    return stop
+
+
+def _wall_times(clock, drive_times, trip_start):
+    """
+    Segundos de manejo (no decrecientes) -> datetime, recorriendo una sola vez
+    los tramos Driving del HOS: clock = [(manejo acumulado al inicio, inicio, fin)].
+    """
+    out, j = [], 0
+    for t in drive_times:
+        if not clock:
+            out.append(trip_start + timedelta(seconds=t))
+            continue
+        if j and t < clock[j][0]:
+            j = 0
+        while j + 1 < len(clock) and clock[j + 1][0] <= t:
+            j += 1
+        base, start, end = clock[j]
+        out.append(min(end, start + timedelta(seconds=max(0.0, t - base))))
+    return out
+
+
+def _arrivals(stops, profile, clock, tk, trip_start):
+    """'at' de cada parada a partir de su milla: perfil de ETA -> manejo HOS -> reloj."""
+    ts = profile.times_at_miles(st["mile"] for st in stops)
+    for st, at in zip(stops, _wall_times(clock, (t / tk for t in ts), trip_start)):
+        st["at"] = at.isoformat()
+
+
+def build_stops(geometry, hos, pickup_ll, dropoff_ll, total_miles, poi_index=None, profile=None):
     """
     Genera paradas: pickup, breaks ~30min, off-duty 10h, fuel cada 1000mi, dropoff.
+    Las posiciones salen del perfil de ETA por vértice (profile: EtaProfile); si no
+    se pasa, se arma uno repartiendo el tiempo de manejo por distancia.
+    Breaks, resets y fuel se ajustan a POIs reales si hay índice (poi_index).
     Devuelve lista siempre aunque hos venga vacío.
     """
     coords = (geometry or {}).get("coordinates") or []
@@ -105,7 +166,12 @@ def build_stops(geometry, hos, pickup_ll, dropoff_ll, total_miles):
     totals = (hos or {}).get("totals", {}) or {}
 
     driving_h = float(totals.get("driving_h") or 0.0)
-    mph = (total_miles / driving_h) if driving_h > 0 else 50.0  
+    if profile is None:
+        drive_s = (driving_h if driving_h > 0 else total_miles / 50.0) * HOUR
+        profile = EtaProfile(coords, total_s=drive_s)
+    cum = profile.cum_mi
+    # millas de ruta (ORS) por milla de geometría; las paradas se calculan sobre la geometría
+    k = (total_miles / profile.total_mi) if profile.total_mi > 0 else 1.0
 
     segs = []
     for day in sorted(logs_by_day.keys()):
@@ -123,18 +189,21 @@ def build_stops(geometry, hos, pickup_ll, dropoff_ll, total_miles):
         "duration_min": 60,
     })
 
-    driven_h = 0.0
+    driven_s = 0.0
+    clock = []      # (manejo acumulado al inicio, inicio, fin) de cada tramo Driving
+    hos_stops = []  # (manejo acumulado, segmento, tipo, título, minutos)
     trip_start = _parse_iso(segs[0]["start"]) if segs else datetime.now(timezone.utc)
 
     for s in segs:
         status = s.get("status")
         start = _parse_iso(s.get("start"))
         end = _parse_iso(s.get("end"))
-        dur_h = max(0.0, (end - start).total_seconds() / 3600.0)
-        dur_min = int(dur_h * 60)
+        dur_s = max(0.0, (end - start).total_seconds())
+        dur_min = int(dur_s / 60)
 
         if status == "Driving":
-            driven_h += dur_h
+            clock.append((driven_s, start, end))
+            driven_s += dur_s
             continue
 
         reason, title = None, None
@@ -146,23 +215,41 @@ def build_stops(geometry, hos, pickup_ll, dropoff_ll, total_miles):
             reason, title = "break", "30 min Break"
 
         if reason:
-            mile = min(total_miles, driven_h * mph)
-            pos = coord_along_line(coords, mile)
-            out.append({
-                "type": reason, "title": title, "at": s.get("start"),
-                "mile": mile, "coord": pos, "duration_min": dur_min
-            })
-
+            hos_stops.append((driven_s, s, reason, title, dur_min))
+
+    # tiempo de manejo HOS -> tiempo del perfil (pueden diferir por redondeo/steps)
+    tk = (profile.total_s / driven_s) if driven_s > 0 and profile.total_s > 0 else 1.0
+
+    positions = profile.locate_many(t * tk for t, *_ in hos_stops)
+    breaks = [
+        _snap_stop({
+            "type": reason, "title": title, "at": s.get("start"),
+            "mile": mile, "coord": pos, "duration_min": dur_min
+        }, coords, cum, poi_index)
+        for (_, s, reason, title, dur_min), (mile, pos) in zip(hos_stops, positions)
+    ]
+    # movida a un POI (más atrás en la ruta): se llega antes que al inicio del tramo HOS
+    _arrivals([b for b in breaks if "poi" in b], profile, clock, tk, trip_start)
+    out.extend(breaks)
+
+    fuel_miles = []
     fuel_mile = 1000.0
     while fuel_mile < total_miles:
-        h_at = fuel_mile / mph
-        at = (trip_start + timedelta(hours=h_at)).isoformat()
-        pos = coord_along_line(coords, fuel_mile)
-        out.append({
-            "type": "fuel", "title": "Fuel", "at": at,
-            "mile": fuel_mile, "coord": pos, "duration_min": 20
-        })
+        fuel_miles.append(fuel_mile / k)
         fuel_mile += 1000.0
+    # fuel se define por distancia: posición directa por milla; el perfil solo da el ETA
+    fuel = [
+        _snap_stop({
+            "type": "fuel", "title": "Fuel", "at": None,
+            "mile": mile, "coord": coord_at_mile(coords, cum, mile), "duration_min": 20
+        }, coords, cum, poi_index)
+        for mile in fuel_miles
+    ]
+    _arrivals(fuel, profile, clock, tk, trip_start)
+    out.extend(fuel)
+
+    for stop in out[1:]:
+        stop["mile"] = round(min(total_miles, stop["mile"] * k), 2)
 
     # Dropoff
     out.append({
@@ -199,9 +286,9 @@ def plan_trip(request):
             )
 
         try:
-            cur_ll = _to_lnglat(geocode(cur))
-            pk_ll = _to_lnglat(geocode(pickup))
-            dp_ll = _to_lnglat(geocode(drop))
+            cur_ll = _to_lnglat(ors.geocode(cur))
+            pk_ll = _to_lnglat(ors.geocode(pickup))
+            dp_ll = _to_lnglat(ors.geocode(drop))
         except ValueError as ge:
             return Response({"error": f"Geocode inválido: {ge}"}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -231,15 +318,19 @@ def plan_trip(request):
             "geometry": geom,
         }
 
+        profile = EtaProfile(geom["coordinates"], d.get("spans"), total_s=route_s)
         stops = build_stops(
             route["geometry"],
             hos,
             pickup_ll=pk_ll,
             dropoff_ll=dp_ll,
             total_miles=route["distance_miles"],
+            poi_index=get_index(),
+            profile=profile,
         )
+        label_stops(stops, get_gazetteer())
 
-        return Response({
+        result = {
             "route": route,
             "stops": stops,
             "hos": {
@@ -247,7 +338,17 @@ def plan_trip(request):
                 "totals": hos["totals"],
                 "logsByDay": to_paperlog_payload(hos["logsByDay"]),
             },
-        })
+        }
+        try:
+            plan = save_plan(result, inputs={
+                "current": cur, "pickup": pickup, "dropoff": drop, "cycleUsedHours": cycle_used,
+            }, cum=profile.cum_mi)
+        except DatabaseError:
+            # el plan ya está calculado: se devuelve sin id en vez de descartarlo
+            import traceback
+            traceback.print_exc()
+            return Response(result)
+        return Response({"id": str(plan.id), **result})
 
     except OrsError as e:
         return Response({"error": str(e)}, status=status.HTTP_502_BAD_GATEWAY)
@@ -258,3 +359,139 @@ def plan_trip(request):
             {"error": f"Server error: {e.__class__.__name__}: {e}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
+
+
+
+def _get_plan(plan_id):
+    try:
+        return Plan.objects.get(pk=plan_id)
+    except Plan.DoesNotExist:
+        return None
+
+
+def _not_found(plan_id):
+    return Response({"error": f"Plan no encontrado: {plan_id}"}, status=status.HTTP_404_NOT_FOUND)
+
+
+def _float_param(request, name) -> Optional[float]:
+    v = request.query_params.get(name)
+    return float(v) if v not in (None, "") else None
+
+
+@api_view(["GET"])
+def plan_summary(request, plan_id):
+    plan = _get_plan(plan_id)
+    if plan is None:
+        return _not_found(plan_id)
+    return Response({
+        "id": str(plan.id),
+        "created_at": plan.created_at.isoformat(),
+        "inputs": plan.inputs,
+        "route": plan.route,
+        "hos": {"totals": plan.hos_totals},
+        "days": list(plan.day_logs.values_list("day", flat=True)),
+        "stops_count": len(plan.stops),
+        "geometry_levels": list(plan.geometries.values_list("level", flat=True)),
+    })
+
+
+@api_view(["GET"])
+def plan_stops(request, plan_id):
+    stops = Plan.objects.filter(pk=plan_id).values_list("stops", flat=True).first()
+    if stops is None:
+        return _not_found(plan_id)
+    return Response({"id": str(plan_id), "stops": stops})
+
+
+@api_view(["GET"])
+def plan_logs(request, plan_id):
+    """
+    Logs HOS del plan. ?day=YYYY-MM-DD para un día, u ?offset=&limit= para paginar.
+    """
+    plan = _get_plan(plan_id)
+    if plan is None:
+        return _not_found(plan_id)
+    qs = plan.day_logs.all()
+    total = qs.count()
+    day = request.query_params.get("day")
+    try:
+        offset = int(request.query_params.get("offset") or 0)
+        limit = int(request.query_params.get("limit") or 0)
+        if offset < 0 or limit < 0:
+            raise ValueError("negativo")
+    except ValueError:
+        return Response({"error": "offset/limit inválidos"}, status=status.HTTP_400_BAD_REQUEST)
+    if day:
+        qs = qs.filter(day=day)
+    elif limit > 0:
+        qs = qs[offset:offset + limit]
+    elif offset:
+        qs = qs[offset:]
+    return Response({
+        "id": str(plan.id),
+        "total_days": total,
+        "totals": plan.hos_totals,
+        "logsByDay": {d.day: d.log for d in qs},
+    })
+
+
+@api_view(["GET"])
+def plan_geometry(request, plan_id):
+    """
+    Geometría del plan. ?level= (0 = completa) o ?zoom= del mapa; ?from_mi=&to_mi= recorta por millas.
+    """
+    try:
+        level = request.query_params.get("level")
+        zoom = _float_param(request, "zoom")
+        if level not in (None, ""):
+            level = int(level)
+        elif zoom is not None:
+            level = level_for_zoom(zoom)
+        else:
+            level = 0
+        from_mi = _float_param(request, "from_mi")
+        to_mi = _float_param(request, "to_mi")
+    except ValueError:
+        return Response({"error": "Parámetros de geometría inválidos"}, status=status.HTTP_400_BAD_REQUEST)
+
+    g = PlanGeometry.objects.filter(plan_id=plan_id, level=level).first()
+    if g is None:
+        if not Plan.objects.filter(pk=plan_id).exists():
+            return _not_found(plan_id)
+        return Response({"error": f"Nivel no disponible: {level}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    coords, miles = slice_by_miles(g.line(), g.mile_marks(), from_mi, to_mi)
+    return Response({
+        "id": str(plan_id),
+        "level": level,
+        "miles": miles,
+        "geometry": {"type": "LineString", "coordinates": coords},
+    })
+
+
+@api_view(["GET"])
+def plan_log_sheets(request, plan_id):
+    """
+    Hojas de log diarias renderizadas en el servidor.
+    ?fmt=svg|pdf|png (default svg; ?format= lo reserva DRF).
+    ?day=YYYY-MM-DD para un solo día; si no, todo el viaje en un documento.
+    """
+    fmt = (request.query_params.get("fmt") or "svg").lower()
+    if fmt not in FORMATS:
+        return Response({"error": f"Formato no soportado: {fmt}"}, status=status.HTTP_400_BAD_REQUEST)
+    if not Plan.objects.filter(pk=plan_id).exists():
+        return _not_found(plan_id)
+    qs = PlanDayLog.objects.filter(plan_id=plan_id)
+    day = request.query_params.get("day")
+    if day:
+        qs = qs.filter(day=day)
+    logs = {d.day: d.log for d in qs}
+    if not logs:
+        return Response({"error": f"Sin logs para: {day}"}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        data = render_logs(logs, fmt)
+    except RenderError as e:
+        return Response({"error": str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+    resp = HttpResponse(data, content_type=FORMATS[fmt])
+    resp["Content-Disposition"] = f'inline; filename="logs-{plan_id}{"-" + day if day else ""}.{fmt}"'
+    return resp
@@ -0,0 +1,26 @@
+"""
+Precarga de estado compartido para el proceso master (gunicorn --preload).
+
+Con un master que hace fork conviene pagar todo una vez ahí: los workers
+heredan módulos, índices y cachés ya construidos (copy-on-write) y el
+primer plan no espera.
+"""
+import os
+
+
+def preload() -> None:
+    if os.getenv("PRELOAD", "1") != "1":
+        return
+    # Django resuelve ROOT_URLCONF recién en el primer request: forzarlo acá
+    # carga api.views y todo lo que arrastra (DRF, modelos, store, render, ors).
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+
+    from .poi.index import get_index
+    from .geocode.reverse import get_gazetteer
+    from .logs import render
+
+    get_index()
+    get_gazetteer()
+    render._grid_svg()
+    render._grid_pdf()
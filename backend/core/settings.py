@@ -33,13 +33,13 @@ ALLOWED_HOSTS = ["localhost", "127.0.0.1", "eld-backend-rta0.onrender.com"]
 
 # Application definition
 
+# Perfil de ejecución:
+#   "api"  (default) solo lo que usa la API: sin admin, sesiones, auth ni
+#          mensajes; arranque más rápido en cada scale-out.
+#   "full" stack completo de Django (admin, browsable API) para desarrollo.
+APP_PROFILE = os.getenv("APP_PROFILE", "api")
+
 INSTALLED_APPS = [
-    'django.contrib.admin',
-    'django.contrib.auth',
-    'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
-    'django.contrib.staticfiles',
     'rest_framework',
     'corsheaders',
     'api',
@@ -48,14 +48,44 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': ['api.renderers.PackedJSONRenderer'],
+    'DEFAULT_PARSER_CLASSES': ['rest_framework.parsers.JSONParser'],
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
+
+if APP_PROFILE == "full":
+    INSTALLED_APPS = [
+        'django.contrib.admin',
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+        *INSTALLED_APPS,
+    ]
+    MIDDLEWARE = [
+        'corsheaders.middleware.CorsMiddleware',
+        'django.middleware.security.SecurityMiddleware',
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.common.CommonMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    ]
+    REST_FRAMEWORK = {
+        'DEFAULT_RENDERER_CLASSES': [
+            'api.renderers.PackedJSONRenderer',
+            'rest_framework.renderers.BrowsableAPIRenderer',
+        ],
+    }
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 TIME_ZONE = "America/Panama"
@@ -71,9 +101,10 @@ TEMPLATES = [
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
+            ] + ([
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-            ],
+            ] if APP_PROFILE == "full" else []),
         },
     },
 ]
@@ -84,10 +115,16 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite local al contenedor: los planes guardados solo existen en la instancia
+# que los calculó. Con varias instancias detrás del balanceador, GET
+# /api/plans/<id> puede dar 404 si cae en otra; para eso hace falta una base
+# compartida (DB_PATH en un volumen común o un motor de red).
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('DB_PATH', BASE_DIR / 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
     }
 }
 
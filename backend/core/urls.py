@@ -14,12 +14,20 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path
 from api import views
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path("api/health", views.health),
     path("api/plan-trip", views.plan_trip, name="plan_trip"),
+    path("api/plans/<uuid:plan_id>", views.plan_summary, name="plan_summary"),
+    path("api/plans/<uuid:plan_id>/stops", views.plan_stops, name="plan_stops"),
+    path("api/plans/<uuid:plan_id>/logs", views.plan_logs, name="plan_logs"),
+    path("api/plans/<uuid:plan_id>/logs/sheets", views.plan_log_sheets, name="plan_log_sheets"),
+    path("api/plans/<uuid:plan_id>/geometry", views.plan_geometry, name="plan_geometry"),
 ]
+
+if "django.contrib.admin" in settings.INSTALLED_APPS:
+    from django.contrib import admin
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
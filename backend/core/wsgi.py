@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Con gunicorn --preload esto corre una vez en el master, antes del fork.
+from api.warmup import preload  # noqa: E402
+preload()
@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from api.hos_engine.scheduler import plan_hos
+from api.routing.ors import duration_spans
+from api.utils.eta import EtaProfile
+from api.utils.geo import PackedLine
+from api.views import _merge_routes, build_stops
+
+# Ruta recta hacia el este sobre lat 40; 1001 vértices
+LINE = PackedLine.from_pairs([[-90.0 + i * 0.01, 40.0] for i in range(1001)])
+
+def test_uniform_profile_roundtrip():
+    p = EtaProfile(LINE, total_s=1000.0)
+    mile, pos = p.locate(500.0)
+    assert mile == pytest.approx(p.total_mi / 2)
+    assert pos[0] == pytest.approx(-85.0)
+    assert p.time_at_mile(mile) == pytest.approx(500.0)
+    assert p.locate(-5)[0] == 0.0 and p.locate(10_000)[0] == p.total_mi
+
+def test_spans_give_per_step_speed():
+    # primera mitad lenta (900 s), segunda rápida (100 s)
+    p = EtaProfile(LINE, [(0, 500, 900.0), (500, 1000, 100.0)])
+    assert p.total_s == pytest.approx(1000.0)
+    assert p.cum_s[500] == pytest.approx(900.0)
+    assert p.locate(450.0)[0] == pytest.approx(p.total_mi / 4)
+    assert p.time_at_mile(p.total_mi * 0.75) == pytest.approx(950.0)
+
+def test_sweeps_match_binary_search():
+    p = EtaProfile(LINE, [(0, 300, 100.0), (300, 301, 0.0), (301, 1000, 700.0)])
+    ts = [0.0, 1.0, 99.9, 100.0, 100.0, 555.5, 800.0, 900.0]
+    assert p.locate_many(ts) == [p.locate(t) for t in ts]
+    ms = [0.0, 3.3, 100.0, 200.0, p.total_mi]
+    assert p.times_at_miles(ms) == pytest.approx([p.time_at_mile(m) for m in ms])
+    # desordenado: sigue siendo correcto
+    assert p.locate_many([800.0, 10.0]) == [p.locate(800.0), p.locate(10.0)]
+
+def test_duration_spans_from_ors_properties():
+    props = {"segments": [{"duration": 30, "steps": [
+        {"duration": 10, "way_points": [0, 4]}, {"duration": 20, "way_points": [4, 9]},
+        {"duration": 0, "way_points": [9, 9]},
+    ]}], "way_points": [0, 9]}
+    assert duration_spans(props) == [(0, 4, 10.0), (4, 9, 20.0), (9, 9, 0.0)]
+    no_steps = {"segments": [{"duration": 5}, {"duration": 7}], "way_points": [0, 3, 8]}
+    assert duration_spans(no_steps) == [(0, 3, 5.0), (3, 8, 7.0)]
+
+def test_merge_routes_offsets_spans():
+    a = {"distance_m": 1, "duration_s": 10, "geometry": {"coordinates": LINE[:501]}, "spans": [(0, 500, 10.0)]}
+    b = {"distance_m": 1, "duration_s": 20, "geometry": {"coordinates": LINE[500:]}}
+    m = _merge_routes(a, b)
+    assert len(m["geometry"]["coordinates"]) == len(LINE)
+    assert m["spans"] == [(0, 500, 10.0), (500, 1000, 20.0)]
+
+def test_build_stops_places_breaks_by_profile():
+    hos = plan_hos(datetime(2025, 1, 1, 6, tzinfo=timezone.utc), 1.6e6, 20 * 3600, [])
+    total_mi = EtaProfile(LINE).total_mi
+    drive_s = 20 * 3600.0
+    uniform = EtaProfile(LINE, total_s=drive_s)
+    # primera mitad a la mitad de velocidad: 2/3 del tiempo
+    slow_start = EtaProfile(LINE, [(0, 500, drive_s * 2 / 3), (500, 1000, drive_s / 3)])
+
+    def first_break(profile):
+        stops = build_stops({"coordinates": LINE}, hos, None, None, total_mi, profile=profile)
+        return next(s for s in stops if s["type"] == "break")
+
+    b_uniform, b_slow = first_break(uniform), first_break(slow_start)
+    assert b_uniform["at"] == b_slow["at"]
+    # 8 h de 20: uniforme en 40%; con arranque lento, 8/13.33 de la primera mitad = 30%
+    assert b_uniform["mile"] == pytest.approx(total_mi * 0.4, abs=0.5)
+    assert b_slow["mile"] == pytest.approx(total_mi * 0.3, abs=0.5)
+
+def test_fuel_at_follows_profile_and_hos_clock():
+    line = PackedLine.from_pairs([[-90.0 + i * 0.05, 40.0] for i in range(601)])
+    p = EtaProfile(line, total_s=40 * 3600.0)
+    hos = plan_hos(datetime(2025, 1, 1, 6, tzinfo=timezone.utc), p.total_mi / 0.000621371, 40 * 3600, [])
+    stops = build_stops({"coordinates": line}, hos, None, None, p.total_mi, profile=p)
+    fuel = [s for s in stops if s["type"] == "fuel"]
+    assert fuel and fuel[0]["mile"] == 1000.0
+    at = datetime.fromisoformat(fuel[0]["at"])
+    # Debe caer dentro de un tramo de manejo del HOS
+    assert any(
+        datetime.fromisoformat(s["start"]) <= at <= datetime.fromisoformat(s["end"])
+        for s in hos["segments"] if s["status"] == "Driving"
+    )
+
+def test_fuel_position_ignores_flat_time_stretches():
+    # tramo 300-600 sin tiempo: la milla 1000 cae en el medio de la meseta
+    p = EtaProfile(LINE, [(0, 300, 100.0), (300, 600, 0.0), (600, 1000, 700.0)])
+    k = 1000.0 / p.cum_mi[450]
+    stops = build_stops({"coordinates": LINE}, {}, None, None, p.total_mi * k, profile=p)
+    fuel = next(s for s in stops if s["type"] == "fuel")
+    assert fuel["mile"] == 1000.0
+    assert fuel["coord"][0] == pytest.approx(-85.5)
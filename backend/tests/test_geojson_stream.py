@@ -0,0 +1,110 @@
+import json
+import tracemalloc
+
+import pytest
+
+from api.routing.geojson_stream import parse_directions, StreamParseError
+from api.utils.geo import PackedLine, cumulative_miles, coord_at_mile
+from api.renderers import PackedJSONRenderer
+from api.views import _merge_routes, build_stops
+
+def _ors_body(n):
+    coords = [[-90.0 + i * 1e-4, 40.0 + (i % 7) * 1e-5] for i in range(n)]
+    return {
+        "type": "FeatureCollection",
+        "bbox": [-90.0, 40.0, -89.0, 40.1],
+        "features": [{
+            "bbox": [-90.0, 40.0, -89.0, 40.1],
+            "type": "Feature",
+            "properties": {
+                "segments": [{"distance": 1234.5, "duration": 99.0, "steps": []}],
+                "way_points": [0, n - 1],
+                "summary": {"distance": 1234.5, "duration": 99.0},
+            },
+            "geometry": {"coordinates": coords, "type": "LineString"},
+        }],
+        "metadata": {"attribution": "openrouteservice.org | OpenStreetMap contributors", "query": {"profile": "driving-hgv"}},
+    }
+
+def _chunks(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+@pytest.mark.parametrize("size", [1, 7, 4096])
+def test_parse_directions_matches_json(size):
+    body = _ors_body(500)
+    raw = json.dumps(body, indent=1 if size == 7 else None).encode()
+    out = parse_directions(_chunks(raw, size))
+    coords = out["geometry"]["coordinates"]
+    assert isinstance(coords, PackedLine)
+    assert coords.tolist() == body["features"][0]["geometry"]["coordinates"]
+    assert out["distance_m"] == 1234.5 and out["duration_s"] == 99.0
+    assert out["properties"]["way_points"] == [0, 499]
+
+def test_parse_directions_rejects_truncated():
+    raw = json.dumps(_ors_body(50)).encode()
+    with pytest.raises(StreamParseError):
+        parse_directions([raw[: len(raw) // 2]])
+
+def test_parse_directions_peak_memory_below_json_loads():
+    raw = json.dumps(_ors_body(100_000)).encode()
+
+    tracemalloc.start()
+    tree = json.loads(raw)
+    _, peak_tree = tracemalloc.get_traced_memory()
+    del tree
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    out = parse_directions(_chunks(raw, 64 * 1024))
+    _, peak_stream = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(out["geometry"]["coordinates"]) == 100_000
+    assert peak_stream < peak_tree / 3
+
+def test_packed_line_helpers_and_merge():
+    a = PackedLine.from_pairs([[0.0, 0.0], [1.0, 0.0]])
+    b = PackedLine.from_pairs([[1.0, 0.0], [2.0, 0.0]])
+    merged = _merge_routes(
+        {"distance_m": 1, "duration_s": 2, "geometry": {"coordinates": a}},
+        {"distance_m": 3, "duration_s": 4, "geometry": {"coordinates": b}},
+    )
+    coords = merged["geometry"]["coordinates"]
+    assert coords.tolist() == [[0.0, 0.0], [1.0, 0.0], [2.0, 0.0]]
+    assert merged["distance_m"] == 4 and merged["duration_s"] == 6
+    cum = cumulative_miles(coords)
+    assert coord_at_mile(coords, cum, cum[-1] / 2) == [1.0, 0.0]
+    assert coords[-1] == (2.0, 0.0) and coords[1:].tolist() == [[1.0, 0.0], [2.0, 0.0]]
+
+def test_build_stops_accepts_packed_line():
+    line = PackedLine.from_pairs([[-90.0 + i * 0.01, 40.0] for i in range(3000)])
+    stops = build_stops({"coordinates": line}, {}, None, None, cumulative_miles(line)[-1])
+    assert stops[0]["coord"] == line[0] and stops[-1]["coord"] == line[-1]
+    assert any(s["type"] == "fuel" for s in stops)
+
+def test_packed_renderer_matches_json():
+    pairs = [[-90.0 + i * 1e-4, 40.0 + (i % 7) * 1e-5] for i in range(10_000)]
+    doc = {"route": {"geometry": {"coordinates": PackedLine.from_pairs(pairs)}},
+           "stops": [{"coord": [1.5, 2.0], "title": "Fuel \"@packed\""}],
+           "other": PackedLine.from_pairs(pairs[:3])}
+    out = json.loads(PackedJSONRenderer().render(doc))
+    assert out == {"route": {"geometry": {"coordinates": pairs}},
+                   "stops": doc["stops"], "other": pairs[:3]}
+
+def test_packed_renderer_peak_memory_below_tolist():
+    line = PackedLine.from_pairs([[-90.0 + i * 1e-4, 40.0] for i in range(100_000)])
+    doc = {"geometry": {"coordinates": line}}
+
+    tracemalloc.start()
+    body = json.dumps({"geometry": {"coordinates": line.tolist()}}).encode()
+    _, peak_tolist = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del body
+
+    tracemalloc.start()
+    body = PackedJSONRenderer().render(doc)
+    _, peak_packed = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(json.loads(body)["geometry"]["coordinates"]) == 100_000
+    assert peak_packed < peak_tolist / 3
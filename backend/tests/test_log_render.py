@@ -0,0 +1,72 @@
+import pytest
+from datetime import datetime, timezone
+from django.urls import reverse
+
+from api.hos_engine.scheduler import plan_hos
+from api.logs import render
+from api.plans.store import save_plan
+
+def _logs():
+    hos = plan_hos(datetime(2025, 1, 1, 6, tzinfo=timezone.utc), 1.6e6, 20 * 3600, [])
+    return hos["logsByDay"]
+
+def test_render_svg_single_and_multi_day():
+    logs = _logs()
+    assert len(logs) >= 2
+    day = sorted(logs)[0]
+    one = render.render_logs({day: logs[day]}, "svg").decode()
+    assert one.startswith("<svg") and one.count("<polyline") == 1
+    assert "Pickup" in one
+    many = render.render_logs(logs, "svg").decode()
+    assert many.count("<polyline") == len(logs)
+    assert many.count('id="grid"') == 1
+
+def test_render_pdf_one_page_per_day():
+    logs = _logs()
+    pdf = render.render_logs(logs, "pdf")
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    assert pdf.count(b"/Type /Page ") == len(logs)
+    assert pdf.count(b"/Subtype /Form") == 1
+
+def test_render_uses_content_hash_cache():
+    render.clear_cache()
+    logs = _logs()
+    render.render_logs(logs, "svg")
+    n = len(render._CACHE)
+    render.render_logs(logs, "svg")
+    assert len(render._CACHE) == n
+    changed = {d: {**l, "segments": l["segments"][:1]} for d, l in logs.items()}
+    render.render_logs(changed, "svg")
+    assert len(render._CACHE) == 2 * n
+
+def test_render_cache_bounded_by_bytes(monkeypatch):
+    render.clear_cache()
+    logs = _logs()
+    day, log = sorted(logs.items())[0]
+    one = len(render.render_logs({day: log}, "svg"))
+    monkeypatch.setattr(render, "CACHE_MAX_BYTES", 3 * one)
+    render.clear_cache()
+    for i in range(20):
+        render.render_logs({day: {**log, "i": i}}, "svg")
+    assert 0 < render._CACHE_BYTES <= 3 * one
+    assert render._CACHE_BYTES == sum(len(v) for v in render._CACHE.values())
+
+def test_render_unknown_format():
+    with pytest.raises(render.RenderError):
+        render.render_logs(_logs(), "bmp")
+
+@pytest.mark.django_db
+def test_plan_log_sheets_endpoint(client):
+    logs = _logs()
+    plan = save_plan({
+        "route": {"distance_miles": 1.0, "duration_hours": 1.0, "geometry": {"coordinates": []}},
+        "stops": [],
+        "hos": {"segments": [], "totals": {}, "logsByDay": logs},
+    })
+    url = reverse("plan_log_sheets", args=[plan.id])
+    r = client.get(url, {"fmt": "pdf"})
+    assert r.status_code == 200 and r["Content-Type"] == "application/pdf"
+    r = client.get(url, {"day": sorted(logs)[0]})
+    assert r.status_code == 200 and r["Content-Type"] == "image/svg+xml"
+    r = client.get(url, {"fmt": "bmp"})
+    assert r.status_code == 400
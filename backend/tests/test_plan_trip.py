@@ -75,3 +75,23 @@ def test_plan_trip_ors_error(monkeypatch, client):
     }
     r = client.post(url, data=json.dumps(payload), content_type="application/json")
     assert r.status_code in (502, 500)
+
+@pytest.mark.django_db
+def test_plan_trip_returns_plan_when_save_fails(monkeypatch, client):
+    from django.db import OperationalError
+    from api import views
+    from api.routing import ors
+
+    def locked(*a, **k):
+        raise OperationalError("database is locked")
+
+    monkeypatch.setattr(ors, "geocode", _fake_geocode)
+    monkeypatch.setattr(ors, "directions", _fake_directions)
+    monkeypatch.setattr(views, "save_plan", locked)
+
+    payload = {"current": "Chicago, IL", "pickup": "Indianapolis, IN", "dropoff": "Pittsburgh, PA"}
+    r = client.post(reverse("plan_trip"), data=json.dumps(payload), content_type="application/json")
+    assert r.status_code == 200, r.content
+    data = r.json()
+    assert "id" not in data
+    assert data["stops"] and data["hos"]["logsByDay"]
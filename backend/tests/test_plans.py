@@ -0,0 +1,117 @@
+import pytest
+from django.urls import reverse
+
+from api.models import Plan, PlanGeometry
+from api.plans.store import save_plan, save_plans, level_for_zoom, build_lods, LOD_LEVELS
+from api.utils.geo import PackedLine, cumulative_miles, simplify
+
+# Zig-zag suave: casi recta, con mucho detalle que se puede simplificar
+LINE = [[-90.0 + i * 0.001, 40.0 + (0.0002 if i % 2 else 0.0)] for i in range(3001)]
+
+def _result():
+    return {
+        "route": {"distance_miles": 160.0, "duration_hours": 3.0,
+                  "geometry": {"type": "LineString", "coordinates": LINE}},
+        "stops": [{"type": "pickup", "mile": 0}, {"type": "dropoff", "mile": 160.0}],
+        "hos": {
+            "segments": [],
+            "totals": {"driving_h": 3.0, "onduty_h": 2.0, "off_h": 0.0},
+            "logsByDay": {
+                "2025-01-01": {"segments": [], "totals": {"driving": 1.0, "onduty": 1.0, "off": 0.0}},
+                "2025-01-02": {"segments": [], "totals": {"driving": 2.0, "onduty": 1.0, "off": 0.0}},
+                "2025-01-03": {"segments": [], "totals": {"driving": 0.0, "onduty": 0.0, "off": 0.0}},
+            },
+        },
+    }
+
+def test_simplify_keeps_endpoints_and_drops_noise():
+    idx = simplify(LINE, 0.001)
+    assert idx[0] == 0 and idx[-1] == len(LINE) - 1
+    assert len(idx) < 10
+
+def test_simplify_bounded_on_staircase():
+    # escalera con escalón > tolerancia: cada partición de DP pelaría un solo vértice
+    pts, x, y = [], -100.0, 30.0
+    for i in range(20001):
+        pts.append([x, y])
+        if i % 2:
+            x += 0.002
+        else:
+            y += 0.002
+    idx = simplify(pts, 0.0005, work_per_vertex=4)
+    assert idx[0] == 0 and idx[-1] == len(pts) - 1
+    assert idx == sorted(set(idx))
+
+def test_build_lods_levels_are_nested():
+    lods = build_lods(LINE)
+    for finer, coarser in zip(lods, lods[1:]):
+        assert set(coarser["miles"]) <= set(finer["miles"])
+        assert len(coarser["coords"]) == len(coarser["miles"])
+
+def test_build_lods_reuses_cum_and_packed_line():
+    line = PackedLine.from_pairs(LINE)
+    cum = cumulative_miles(line)
+    lods = build_lods(line, cum)
+    assert lods[0]["coords"] is line and lods[0]["miles"] is cum
+    assert lods[-1]["miles"][-1] == cum[-1]
+
+def test_level_for_zoom():
+    assert level_for_zoom(14) == 0
+    assert level_for_zoom(10) == 1
+    assert level_for_zoom(2) == len(LOD_LEVELS) - 1
+
+@pytest.mark.django_db
+def test_save_plans_bulk():
+    plans = save_plans([{"result": _result(), "inputs": {"current": "a"}} for _ in range(3)])
+    assert Plan.objects.count() == 3
+    assert PlanGeometry.objects.filter(plan=plans[0]).count() == len(LOD_LEVELS)
+    full = PlanGeometry.objects.get(plan=plans[0], level=0)
+    coarse = PlanGeometry.objects.get(plan=plans[0], level=len(LOD_LEVELS) - 1)
+    assert full.line().tolist() == LINE
+    assert len(coarse.line()) < len(full.line())
+    assert coarse.mile_marks()[-1] == full.mile_marks()[-1]
+
+@pytest.mark.django_db
+def test_plan_get_endpoints(client):
+    plan = save_plan(_result(), inputs={"current": "Chicago, IL"})
+
+    r = client.get(reverse("plan_summary", args=[plan.id]))
+    assert r.status_code == 200
+    data = r.json()
+    assert data["route"] == {"distance_miles": 160.0, "duration_hours": 3.0}
+    assert data["days"] == ["2025-01-01", "2025-01-02", "2025-01-03"]
+
+    r = client.get(reverse("plan_stops", args=[plan.id]))
+    assert [s["type"] for s in r.json()["stops"]] == ["pickup", "dropoff"]
+
+    r = client.get(reverse("plan_logs", args=[plan.id]), {"offset": 1, "limit": 1})
+    assert list(r.json()["logsByDay"]) == ["2025-01-02"]
+    assert r.json()["total_days"] == 3
+
+    r = client.get(reverse("plan_logs", args=[plan.id]), {"day": "2025-01-03"})
+    assert list(r.json()["logsByDay"]) == ["2025-01-03"]
+
+    r = client.get(reverse("plan_geometry", args=[plan.id]), {"zoom": 3})
+    coarse = r.json()
+    assert coarse["level"] == len(LOD_LEVELS) - 1
+    assert len(coarse["geometry"]["coordinates"]) < len(LINE)
+
+    r = client.get(reverse("plan_geometry", args=[plan.id]), {"from_mi": 50, "to_mi": 60})
+    miles = r.json()["miles"]
+    assert miles[0] <= 50 and miles[-1] >= 60
+    assert len(miles) < len(LINE) / 5
+
+@pytest.mark.django_db
+def test_plan_logs_rejects_bad_paging(client):
+    plan = save_plan(_result())
+    url = reverse("plan_logs", args=[plan.id])
+    for params in ({"offset": -1, "limit": 1}, {"limit": -1}, {"offset": "x"}):
+        assert client.get(url, params).status_code == 400
+
+@pytest.mark.django_db
+def test_plan_not_found(client):
+    import uuid
+    r = client.get(reverse("plan_summary", args=[uuid.uuid4()]))
+    assert r.status_code == 404
+    r = client.get(reverse("plan_geometry", args=[uuid.uuid4()]))
+    assert r.status_code == 404
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from api.hos_engine.scheduler import plan_hos
+from api.poi.index import Poi, PoiIndex, load_pois
+from api.utils.geo import cumulative_miles, coord_at_mile, coord_along_line
+from api.views import build_stops
+
+# Ruta recta hacia el este sobre lat 40 (~0.53 mi por vértice)
+LINE = [[-90.0 + i * 0.01, 40.0] for i in range(2001)]
+
+def test_coord_at_mile_matches_coord_along_line():
+    cum = cumulative_miles(LINE)
+    for m in (0, 0.2, 13.7, 250.0, 5000.0):
+        a = coord_at_mile(LINE, cum, m)
+        b = coord_along_line(LINE, m)
+        assert abs(a[0] - b[0]) < 1e-9 and abs(a[1] - b[1]) < 1e-9
+
+def test_near_point_filters_by_kind_and_radius():
+    idx = PoiIndex([
+        Poi("A", "fuel", -89.0, 40.01),
+        Poi("B", "rest_area", -89.0, 40.0),
+        Poi("C", "fuel", -85.0, 40.0),
+    ])
+    hits = idx.near_point([-89.0, 40.0], 5.0, kinds=["fuel"])
+    assert [p.name for _, p in hits] == ["A"]
+
+def test_nearest_in_corridor_prefers_before_mile():
+    cum = cumulative_miles(LINE)
+    target = coord_at_mile(LINE, cum, 500.0)
+    behind = Poi("Behind", "truck_stop", target[0] - 0.2, 40.02)
+    ahead = Poi("Ahead", "truck_stop", target[0] + 0.05, 40.0)
+    far = Poi("OffRoute", "truck_stop", target[0], 41.0)
+    idx = PoiIndex([behind, ahead, far])
+
+    hit = idx.nearest_in_corridor(LINE, cum, 500.0, kinds=["truck_stop"])
+    assert hit is not None and hit.poi.name == "Behind"
+    assert hit.mile <= 500.0 and hit.offset_mi <= 2.0
+
+    assert idx.nearest_in_corridor(LINE, cum, 500.0, kinds=["fuel"]) is None
+
+def test_nearest_in_corridor_measures_to_segments():
+    # tramos rectos de ~21 mi: el POI queda a mitad de tramo, lejos de todo vértice
+    coords = [[-90.0 + i * 0.4, 40.0] for i in range(40)]
+    cum = cumulative_miles(coords)
+    k = 23
+    mid = (coords[k][0] + coords[k + 1][0]) / 2
+    poi = Poi("Mid", "truck_stop", mid, 40.0 + 0.35 / 69.0)
+    idx = PoiIndex([poi])
+
+    hit = idx.nearest_in_corridor(coords, cum, cum[k + 1] + 5.0, kinds=["truck_stop"])
+    assert hit is not None and hit.poi.name == "Mid"
+    assert abs(hit.offset_mi - 0.35) < 0.01
+    assert abs(hit.mile - (cum[k] + cum[k + 1]) / 2) < 0.1
+
+def test_build_stops_snaps_fuel_to_poi():
+    cum = cumulative_miles(LINE)
+    at_1000 = coord_at_mile(LINE, cum, 1000.0)
+    idx = PoiIndex([Poi("Pilot", "truck_stop", at_1000[0] - 0.1, 40.0)])
+    stops = build_stops({"coordinates": LINE}, {}, LINE[0], LINE[-1], cum[-1], poi_index=idx)
+    fuel = [s for s in stops if s["type"] == "fuel"]
+    assert fuel and fuel[0]["poi"]["name"] == "Pilot"
+    assert fuel[0]["coord"] == [at_1000[0] - 0.1, 40.0]
+    assert fuel[0]["mile"] < 1000.0
+
+def test_snapped_break_time_matches_its_mile():
+    cum = cumulative_miles(LINE)
+    hos = plan_hos(datetime(2025, 1, 1, 6, tzinfo=timezone.utc), cum[-1] / 0.000621371, 20 * 3600, [])
+    plain = next(s for s in build_stops({"coordinates": LINE}, hos, None, None, cum[-1]) if s["type"] == "break")
+
+    at = coord_at_mile(LINE, cum, plain["mile"] - 20.0)
+    idx = PoiIndex([Poi("Rest", "rest_area", at[0], 40.0)])
+    snapped = next(s for s in build_stops({"coordinates": LINE}, hos, None, None, cum[-1], poi_index=idx)
+                   if s["type"] == "break")
+    assert snapped["poi"]["name"] == "Rest"
+    assert snapped["mile"] == pytest.approx(plain["mile"] - 20.0, abs=0.1)
+    # 20 mi antes sobre ~1060 mi en 20 h de manejo: ~23 min antes
+    early = datetime.fromisoformat(plain["at"]) - datetime.fromisoformat(snapped["at"])
+    assert early == pytest.approx(timedelta(hours=20 * 20.0 / cum[-1]), abs=timedelta(seconds=30))
+
+def test_load_pois_skips_bad_rows(tmp_path):
+    p = tmp_path / "pois.csv"
+    p.write_text("name,kind,lng,lat\nLoves,truck_stop,-88.5,39.1\nbad,fuel,x,y\n")
+    pois = load_pois(str(p))
+    assert pois == [Poi("Loves", "truck_stop", -88.5, 39.1)]
+
+class _Counting(list):
+    """Lista que cuenta los elementos leídos (por índice o iterando)."""
+    reads = 0
+
+    def __getitem__(self, i):
+        _Counting.reads += 1
+        return super().__getitem__(i)
+
+    def __iter__(self):
+        for x in super().__iter__():
+            _Counting.reads += 1
+            yield x
+
+def test_nearest_in_corridor_only_reads_window():
+    coords = [[-90.0 + i * 0.001, 40.0] for i in range(100_001)]   # ~5300 mi
+    cum = cumulative_miles(coords)
+    far_mile = cum[-1] - 10.0
+    at = coord_at_mile(coords, cum, far_mile - 5.0)
+    idx = PoiIndex([Poi("Far", "truck_stop", at[0], 40.001)])
+
+    line, cum_c = _Counting(coords), _Counting(cum)
+    _Counting.reads = 0
+    hit = idx.nearest_in_corridor(line, cum_c, far_mile, kinds=["truck_stop"])
+    assert hit is not None and hit.poi.name == "Far"
+    assert abs(hit.mile - (far_mile - 5.0)) < 1.0
+    # ventana de 50 mi ~ 1% de la ruta: no se recorre desde el vértice 0
+    assert _Counting.reads < len(coords) / 10
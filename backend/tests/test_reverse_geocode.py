@@ -0,0 +1,43 @@
+import random
+
+from api.geocode.reverse import Gazetteer, Place, KDTree, _xyz, label_stops, load_places
+from api.utils.geo import haversine_mi
+
+PLACES = [
+    Place("city", "Effingham", "IL", lng=-88.5434, lat=39.1200),
+    Place("city", "Vandalia", "IL", lng=-89.0931, lat=38.9606),
+    Place("city", "Terre Haute", "IN", lng=-87.4139, lat=39.4667),
+    Place("exit", "", route="I-70", exit="160", lng=-88.5660, lat=39.1050),
+    Place("exit", "", route="I-57", exit="159", lng=-88.5580, lat=39.1460),
+]
+
+def test_kdtree_matches_brute_force():
+    rnd = random.Random(7)
+    pts = [(rnd.uniform(-125, -67), rnd.uniform(25, 49)) for _ in range(2000)]
+    tree = KDTree([_xyz(*p) for p in pts])
+    for _ in range(200):
+        q = (rnd.uniform(-125, -67), rnd.uniform(25, 49))
+        i, _ = tree.nearest(_xyz(*q))
+        best = min(range(len(pts)), key=lambda k: haversine_mi(q, pts[k]))
+        assert haversine_mi(q, pts[i]) == haversine_mi(q, pts[best])
+
+def test_label_city_and_exit():
+    g = Gazetteer(PLACES)
+    assert g.label([-88.5650, 39.1060]) == "near Effingham, IL (I-70 exit 160)"
+    # lejos de cualquier salida: solo ciudad
+    assert g.label([-89.0, 39.0]) == "near Vandalia, IL"
+    # nada cerca
+    assert g.label([-100.0, 45.0]) is None
+
+def test_label_stops_batch():
+    stops = [{"coord": [-88.5650, 39.1060]}, {"coord": [-100.0, 45.0]}, {"coord": None}]
+    label_stops(stops, Gazetteer(PLACES))
+    assert stops[0]["place"].startswith("near Effingham")
+    assert "place" not in stops[1] and "place" not in stops[2]
+
+def test_load_places(tmp_path):
+    p = tmp_path / "gaz.csv"
+    p.write_text("kind,name,state,route,exit,lng,lat\ncity,Effingham,IL,,,-88.5434,39.12\nexit,,,I-70,160,-88.566,39.105\nexit,,,I-70,x,bad,1\n")
+    places = load_places(str(p))
+    assert [pl.kind for pl in places] == ["city", "exit"]
+    assert places[1].route == "I-70" and places[1].exit == "160"
@@ -0,0 +1,121 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# Presupuesto de arranque en un proceso nuevo: Django + URLs + el primer
+# plan-trip servido (ORS simulado, ruta de ROUTE_VERTICES vértices, con
+# escritura en la base y armado de LODs). Para no depender de la CPU del CI,
+# se presupuesta lo que agrega la app por encima del piso de importar Django
+# y DRF en el mismo proceso, como fracción de ese piso. Medido ~0.39 (0.11 s
+# sobre 0.29 s); el presupuesto deja 50% de margen. Se toma el mejor de RUNS.
+STARTUP_APP_MEASURED = 0.39
+STARTUP_APP_BUDGET = STARTUP_APP_MEASURED * 1.5
+ROUTE_VERTICES = 20_000
+RUNS = 3
+
+PROBE = r"""
+import json, os, sys, time
+n = int(os.environ["ROUTE_VERTICES"])
+coords = [[-90.0 + i * 1e-4, 40.0 + (i % 7) * 1e-5] for i in range(n)]
+raw = json.dumps({"type": "FeatureCollection", "features": [{
+    "type": "Feature",
+    "properties": {"segments": [{"distance": n * 8.5, "duration": n * 0.35, "steps": []}],
+                   "way_points": [0, n - 1], "summary": {"distance": n * 8.5, "duration": n * 0.35}},
+    "geometry": {"type": "LineString", "coordinates": coords}}]}).encode()
+del coords
+
+t0 = time.perf_counter()
+import django, django.test, rest_framework.views     # piso: Django + DRF
+t_floor = time.perf_counter() - t0
+import django.apps
+django.setup()
+from django.test import Client
+import core.urls
+t_import = time.perf_counter() - t0
+client = Client()
+health = client.get("/api/health", HTTP_HOST="localhost")
+t_first = time.perf_counter() - t0
+
+from api.routing import ors
+from api.routing.geojson_stream import parse_directions
+def directions(points):
+    d = parse_directions(raw[i:i + ors.CHUNK_BYTES] for i in range(0, len(raw), ors.CHUNK_BYTES))
+    d["spans"] = ors.duration_spans(d.pop("properties"))
+    return d
+ors.directions = directions
+ors.geocode = lambda q: (40.0, -90.0) if q != "dropoff" else (40.0, -90.0 + n * 1e-4)
+plan = client.post("/api/plan-trip", {"current": "current", "pickup": "pickup", "dropoff": "dropoff"},
+                   content_type="application/json", HTTP_HOST="localhost")
+t_plan = time.perf_counter() - t0
+
+print(json.dumps({
+    "floor_s": t_floor,
+    "import_s": t_import,
+    "first_request_s": t_first,
+    "first_plan_s": t_plan,
+    "app_ratio": (t_plan - t_floor) / t_floor,
+    "status": health.status_code,
+    "plan_status": plan.status_code,
+    "plan_id": "id" in plan.json(),
+    "loaded": [m for m in ("django.contrib.sessions.middleware",
+                           "django.contrib.auth.middleware") if m in sys.modules],
+    "apps": [a.label for a in django.apps.apps.get_app_configs()],
+}))
+"""
+
+@pytest.fixture(scope="module")
+def db_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("startup") / "db.sqlite3"
+    e = {**os.environ, "DJANGO_SETTINGS_MODULE": "core.settings", "PRELOAD": "0", "DB_PATH": str(path)}
+    subprocess.run([sys.executable, "manage.py", "migrate", "-v0"], cwd=BACKEND, env=e,
+                   capture_output=True, timeout=120, check=True)
+    return path
+
+def _probe(db_path, **env):
+    e = {**os.environ, "DJANGO_SETTINGS_MODULE": "core.settings", "PRELOAD": "0",
+         "DB_PATH": str(db_path), "ROUTE_VERTICES": str(ROUTE_VERTICES), **env}
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND, env=e,
+                         capture_output=True, text=True, timeout=60, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def test_api_profile_startup_budget(db_path):
+    runs = [_probe(db_path, APP_PROFILE="api") for _ in range(RUNS)]
+    data = min(runs, key=lambda d: d["app_ratio"])
+    print("startup:", data)
+    assert all(d["status"] == 200 and d["plan_status"] == 200 and d["plan_id"] for d in runs)
+    assert data["app_ratio"] < STARTUP_APP_BUDGET
+
+def test_api_profile_drops_unused_apps(db_path):
+    data = _probe(db_path, APP_PROFILE="api")
+    assert data["loaded"] == []
+    assert sorted(data["apps"]) == ["api", "corsheaders", "rest_framework"]
+
+PRELOAD_PROBE = r"""
+import json, sys
+import django
+django.setup()
+loaded_before = "api.views" in sys.modules
+from api.warmup import preload
+from api.logs import render
+preload()
+print(json.dumps({
+    "views_before": loaded_before,
+    "views_after": "api.views" in sys.modules,
+    "grid_cached": render._grid_svg.cache_info().currsize,
+}))
+"""
+
+def test_preload_builds_shared_state():
+    e = {**os.environ, "DJANGO_SETTINGS_MODULE": "core.settings", "PRELOAD": "1"}
+    out = subprocess.run([sys.executable, "-c", PRELOAD_PROBE], cwd=BACKEND, env=e,
+                         capture_output=True, text=True, timeout=60, check=True)
+    data = json.loads(out.stdout.strip().splitlines()[-1])
+    assert data["views_before"] is False
+    assert data["views_after"] is True
+    assert data["grid_cached"] == 1
@@ -19,6 +19,8 @@ export type Stop = {
   coord: [number, number];
   duration_min?: number;
   note?: string;
+  poi?: { name: string; kind: string };
+  place?: string;
 };
 
 export interface DayLog {
@@ -35,6 +37,7 @@ export interface PlanTripReq {
 }
 
 export interface PlanTripResp {
+  id?: string;
   route: {
     distance_miles: number;
     duration_hours: number;